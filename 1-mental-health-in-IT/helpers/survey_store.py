@@ -0,0 +1,210 @@
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dataset")
+
+
+class SurveyStore:
+    """
+    Long-format store of mental health survey answers.
+
+    The wide dataset (one row per UserID, one column per question ID, mostly
+    blank) is converted to arrays of (user, survey year, question, answer
+    code) for given answers only, sorted by question, year and user. Answers
+    are categorical codes into one array of answer texts. Offsets of every
+    (question, year) block index the arrays, so queries read only the blocks
+    of the requested questions and years and never rebuild the wide frame.
+    """
+
+    def __init__(
+        self,
+        answers_csv: str = os.path.join(DATASET_DIR, "mental_health.csv"),
+        questions_csv: Optional[str] = os.path.join(DATASET_DIR, "question_list.csv"),
+    ):
+        """
+        Params:
+        answers_csv       Wide answers dataset (UserID, SurveyID, question ID columns)
+        questions_csv     Question list (QuestionID, Question, SurveysCovered)
+                          (default dataset/question_list.csv; None - no question texts)
+        """
+        wide = pd.read_csv(answers_csv, dtype=str)
+        question_cols = [
+            col for col in wide.columns if col not in ("UserID", "SurveyID")
+        ]
+
+        values = wide[question_cols].to_numpy(dtype=object)
+        row, col = np.nonzero(wide[question_cols].notna().to_numpy())
+        users = wide["UserID"].to_numpy(dtype=np.int32)
+        years = wide["SurveyID"].to_numpy(dtype=np.int16)
+        question_ids = np.array([int(q) for q in question_cols], dtype=np.int16)
+
+        codes, self.answer_labels = pd.factorize(values[row, col], sort=True)
+        self.answer_labels = np.asarray(self.answer_labels, dtype=object)
+
+        order = np.lexsort((users[row], years[row], question_ids[col]))
+        self.user = users[row][order]
+        self.year = years[row][order]
+        self.question = question_ids[col][order]
+        self.answer = codes.astype(np.int32)[order]
+
+        self.years = np.unique(years)
+        self.n_users = len(wide)
+
+        # (question, year) -> (start, end) of the block in sorted arrays
+        keys = self.question.astype(np.int64) * 10000 + self.year
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+        self._blocks: Dict[tuple, tuple] = {
+            (int(self.question[s]), int(self.year[s])): (int(s), int(e))
+            for s, e in zip(starts, ends)
+        }
+
+        self.questions = None
+        if questions_csv is not None:
+            self.questions = pd.read_csv(questions_csv).set_index("QuestionID")
+
+    def question_text(self, question: int) -> str:
+        """
+        Text of a question (question ID if the question is not in question list).
+        """
+        if self.questions is None or question not in self.questions.index:
+            return str(question)
+        return self.questions.loc[question, "Question"]
+
+    def _rows(self, question: int, years: Optional[Iterable[int]] = None) -> np.ndarray:
+        """
+        Positions of answers to a question in given years (all years if None).
+        """
+        years = self.years if years is None else years
+        blocks = [
+            self._blocks[(question, int(year))]
+            for year in years
+            if (question, int(year)) in self._blocks
+        ]
+        if not blocks:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([np.arange(start, end) for start, end in blocks])
+
+    def answers(
+        self, question: int, years: Optional[Iterable[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Answers to a question in long format: 'UserID', 'SurveyID', 'Answer'.
+        """
+        rows = self._rows(question, years)
+        return pd.DataFrame(
+            {
+                "UserID": self.user[rows],
+                "SurveyID": self.year[rows],
+                "Answer": pd.Categorical.from_codes(
+                    self.answer[rows], categories=self.answer_labels
+                ).remove_unused_categories(),
+            }
+        )
+
+    def distribution(
+        self,
+        question: int,
+        years: Optional[Iterable[int]] = None,
+        normalize: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Answer distribution of a question by survey year.
+
+        Params:
+        question          Question ID
+        years             Survey years (default None - all years)
+        normalize         Shares of answers in every year instead of counts (default False)
+
+        Returns:
+        DataFrame: answers in rows, survey years in columns.
+        """
+        return self.crosstab(question, None, years, normalize)
+
+    def crosstab(
+        self,
+        question: int,
+        split_by: Optional[int] = None,
+        years: Optional[Iterable[int]] = None,
+        normalize: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Answer distribution of a question by survey year, split by answers of
+        another question of the same respondents (e.g. answers of question 17
+        by year and gender - question 2).
+
+        Params:
+        question          Question ID
+        split_by          Question ID to split by (default None - no split)
+        years             Survey years (default None - all years)
+        normalize         Shares of answers in every column instead of counts (default False)
+
+        Returns:
+        DataFrame: answers in rows; survey years (and answers of split_by) in columns.
+        """
+        rows = self._rows(question, years)
+        users, answer_codes = self.user[rows], self.answer[rows]
+        year_index = np.searchsorted(self.years, self.year[rows])
+
+        if split_by is None:
+            split_codes = np.zeros(len(rows), dtype=np.int64)
+            split_labels = None
+        else:
+            split_rows = self._rows(split_by, years)
+            # users are unique across surveys, so a user identifies the respondent
+            _, in_x, in_split = np.intersect1d(
+                users, self.user[split_rows], assume_unique=True, return_indices=True
+            )
+            answer_codes, year_index = answer_codes[in_x], year_index[in_x]
+            split_labels, split_codes = np.unique(
+                self.answer[split_rows][in_split], return_inverse=True
+            )
+
+        answer_labels, answer_index = np.unique(answer_codes, return_inverse=True)
+        n_answers, n_years = len(answer_labels), len(self.years)
+        n_splits = 1 if split_labels is None else len(split_labels)
+
+        flat = (answer_index * n_years + year_index) * n_splits + split_codes
+        counts = np.bincount(flat, minlength=n_answers * n_years * n_splits).reshape(
+            n_answers, n_years * n_splits
+        )
+
+        if split_labels is None:
+            columns = pd.Index(self.years, name="SurveyID")
+        else:
+            columns = pd.MultiIndex.from_product(
+                [self.years, self.answer_labels[split_labels]],
+                names=["SurveyID", self.question_text(split_by)],
+            )
+        table = pd.DataFrame(
+            counts,
+            index=pd.Index(
+                self.answer_labels[answer_labels], name=self.question_text(question)
+            ),
+            columns=columns,
+        )
+        table = table.loc[:, table.sum(axis=0) > 0]
+
+        if normalize:
+            table = table / table.sum(axis=0)
+        return table
+
+    def wide(
+        self, questions: List[int], years: Optional[Iterable[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Wide frame of selected questions only (one row per respondent who
+        answered any of them).
+        """
+        frames = [
+            self.answers(question, years).assign(QuestionID=question)
+            for question in questions
+        ]
+        long = pd.concat(frames, ignore_index=True)
+        long["Answer"] = long["Answer"].astype(object)
+        return long.pivot(
+            index=["UserID", "SurveyID"], columns="QuestionID", values="Answer"
+        )
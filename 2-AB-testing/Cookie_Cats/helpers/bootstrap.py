@@ -0,0 +1,127 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from shared_helpers.chunking import chunk_sizes, rows_per_chunk
+
+
+def _is_binary(values: np.ndarray) -> bool:
+    """
+    Checks whether every column of a 2D array holds only 0/1 (or boolean) values.
+    """
+    return bool(np.isin(values, (0, 1)).all())
+
+
+def _bootstrap_chunk(
+    task: Tuple[np.ndarray, Optional[np.ndarray], int, int, np.random.SeedSequence],
+) -> np.ndarray:
+    """
+    Computes metric means for one chunk of bootstrap replicates of one arm.
+
+    Parameters:
+    task    tuple of (values, pattern_probs, sample_size, n_rows, seed_seq):
+            values         2D array (rows or unique 0/1 patterns x metrics)
+            pattern_probs  probabilities of 0/1 patterns or None for index resampling
+            sample_size    size of every bootstrap sample
+            n_rows         number of replicates in the chunk
+            seed_seq       seed sequence dedicated to the chunk
+
+    Returns:
+    2D array (replicates x metrics) with bootstrapped means.
+    """
+    values, pattern_probs, sample_size, n_rows, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+
+    if pattern_probs is not None:
+        counts = rng.multinomial(sample_size, pattern_probs, size=n_rows)
+        return counts @ values / sample_size
+
+    idx = rng.integers(0, values.shape[0], size=(n_rows, sample_size))
+    return values[idx].mean(axis=1)
+
+
+def bootstrap_means(
+    df: pd.DataFrame,
+    group_col: str,
+    groups: Dict[str, str],
+    metrics: Dict[str, str],
+    n_replicates: int = 1000,
+    sample_size: Optional[int] = None,
+    seed: int = 2024,
+    max_chunk_mb: float = 64.0,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """
+    Vectorized bootstrap of metric means for every arm of an A/B test.
+
+    Replaces the loop of DataFrame.sample(replace=True) calls: resample indices
+    are drawn as NumPy arrays in memory-bounded chunks and all metrics of a
+    chunk are averaged in one pass. If all metrics are binary (e.g. retention
+    flags), multinomial counts of the joint 0/1 patterns are drawn instead of
+    indices, which is equivalent to row resampling but does not depend on
+    sample size. Every chunk has its own seed spawned from the seed, so results
+    are the same for any n_jobs.
+
+    Parameters:
+    df            pd.DataFrame    data of the experiment
+    group_col     str             column with arm labels (e.g. "version")
+    groups        dict            arm label -> name used in output columns,
+                                  e.g. {"gate_30": "control", "gate_40": "experiment"}
+    metrics       dict            metric column -> suffix used in output columns,
+                                  e.g. {"retention_1": "r1", "retention_7": "r7"}
+    n_replicates  int             number of bootstrap replicates, default is 1000
+    sample_size   int             size of every bootstrap sample, default is arm size
+    seed          int             seed for reproducibility, default is 2024
+    max_chunk_mb  float           memory limit for one chunk of resample indices
+                                  in MB, default is 64
+    n_jobs        int             number of worker processes, default is 1 (no pool)
+
+    Returns:
+    bootstrap_df  pd.DataFrame    replicates x columns "bootstrap_{group}_{metric}",
+                                  ordered by metric, then by group (same layout as
+                                  bootstrap_df in the notebook)
+    """
+    metric_cols = list(metrics)
+    arm_seeds = np.random.SeedSequence(seed).spawn(len(groups))
+    results = {}
+
+    for (group, group_name), arm_seed in zip(groups.items(), arm_seeds):
+        values = df.loc[df[group_col] == group, metric_cols].to_numpy(dtype=float)
+        if values.shape[0] == 0:
+            raise ValueError(f"There are no rows for '{group}' in '{group_col}'.")
+        n_sample = sample_size or values.shape[0]
+
+        if _is_binary(values):
+            values, pattern_counts = np.unique(values, axis=0, return_counts=True)
+            pattern_probs = pattern_counts / pattern_counts.sum()
+            row_bytes = values.shape[0] * 8
+        else:
+            pattern_probs = None
+            row_bytes = n_sample * len(metric_cols) * 8 + n_sample * 8
+
+        chunk_size = rows_per_chunk(max_chunk_mb, row_bytes)
+        sizes = chunk_sizes(n_replicates, chunk_size)
+        tasks = [
+            (values, pattern_probs, n_sample, n_rows, chunk_seed)
+            for n_rows, chunk_seed in zip(sizes, arm_seed.spawn(len(sizes)))
+        ]
+
+        if n_jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                chunks = list(executor.map(_bootstrap_chunk, tasks))
+        else:
+            chunks = [_bootstrap_chunk(task) for task in tasks]
+
+        results[group_name] = np.vstack(chunks)
+
+    bootstrap_df = pd.DataFrame(
+        {
+            f"bootstrap_{group_name}_{suffix}": results[group_name][:, i]
+            for i, suffix in enumerate(metrics.values())
+            for group_name in groups.values()
+        }
+    )
+
+    return bootstrap_df
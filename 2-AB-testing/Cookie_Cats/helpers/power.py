@@ -0,0 +1,384 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from shared_helpers.chunking import chunk_sizes, rows_per_chunk
+
+ALTERNATIVES = ("two-sided", "larger", "smaller")
+
+
+def _critical_value(alpha: float, alternative: str) -> float:
+    """
+    Critical value of the standard normal distribution for a z-test.
+    """
+    if alternative not in ALTERNATIVES:
+        raise ValueError(
+            f"Unknown alternative '{alternative}', use one of {ALTERNATIVES}."
+        )
+    return stats.norm.ppf(1 - alpha / 2 if alternative == "two-sided" else 1 - alpha)
+
+
+def _rejects(z_stat: np.ndarray, z_crit: float, alternative: str) -> np.ndarray:
+    """
+    Rejections of the null hypothesis for z statistics (treatment - control).
+    """
+    if alternative == "two-sided":
+        return np.abs(z_stat) > z_crit
+    if alternative == "larger":
+        return z_stat > z_crit
+    return z_stat < -z_crit
+
+
+def baseline_rates(ab_test_agg: pd.DataFrame, control: str = "gate_30") -> Dict:
+    """
+    Baseline rates of the control arm from an aggregated A/B test table.
+
+    Parameters:
+    ab_test_agg   pd.DataFrame    arms in rows, "<metric>_rate" columns
+                                  (e.g. ab_test_agg in the notebook)
+    control       str             row label of the control arm, default is "gate_30"
+
+    Returns:
+    dict          metric -> rate, e.g. {"retention_1": 0.448, "retention_7": 0.190}
+    """
+    rate_cols = [col for col in ab_test_agg.columns if col.endswith("_rate")]
+    return {
+        col[: -len("_rate")]: float(ab_test_agg.loc[control, col]) for col in rate_cols
+    }
+
+
+def analytic_power(
+    p_control: np.ndarray,
+    p_treatment: np.ndarray,
+    n_control: np.ndarray,
+    n_treatment: np.ndarray,
+    alpha: float = 0.05,
+    alternative: str = "two-sided",
+) -> np.ndarray:
+    """
+    Power of the two-proportion z-test with pooled variance (as statsmodels
+    proportions_ztest) from the normal approximation. Arguments are broadcast,
+    so power of whole grids of scenarios is computed at once.
+
+    Parameters:
+    p_control     np.ndarray      success rates of the control arm
+    p_treatment   np.ndarray      success rates of the treatment arm
+    n_control     np.ndarray      sizes of the control arm
+    n_treatment   np.ndarray      sizes of the treatment arm
+    alpha         float           significance level, default is 0.05
+    alternative   str             "two-sided", "larger" or "smaller" (treatment vs
+                                  control), default is "two-sided"
+
+    Returns:
+    np.ndarray    power of every scenario
+    """
+    z_crit = _critical_value(alpha, alternative)
+    p_control, p_treatment = np.asarray(p_control), np.asarray(p_treatment)
+    n_control, n_treatment = np.asarray(n_control), np.asarray(n_treatment)
+
+    p_pooled = (n_control * p_control + n_treatment * p_treatment) / (
+        n_control + n_treatment
+    )
+    se_null = np.sqrt(p_pooled * (1 - p_pooled) * (1 / n_control + 1 / n_treatment))
+    se_alt = np.sqrt(
+        p_control * (1 - p_control) / n_control
+        + p_treatment * (1 - p_treatment) / n_treatment
+    )
+    diff = p_treatment - p_control
+
+    upper = stats.norm.sf((z_crit * se_null - diff) / se_alt)
+    lower = stats.norm.cdf((-z_crit * se_null - diff) / se_alt)
+    if alternative == "two-sided":
+        return upper + lower
+    return upper if alternative == "larger" else lower
+
+
+def analytic_sample_size(
+    p_control: np.ndarray,
+    p_treatment: np.ndarray,
+    allocation: np.ndarray = 0.5,
+    power: float = 0.8,
+    alpha: float = 0.05,
+    alternative: str = "two-sided",
+) -> np.ndarray:
+    """
+    Total sample size (both arms) of the two-proportion z-test for a target
+    power from the normal approximation (the opposite tail of a two-sided
+    test is ignored). Arguments are broadcast. Effects in the direction
+    opposite to a one-sided alternative (or zero effects) are never detected
+    with power above alpha, their sample size is inf.
+
+    Parameters:
+    p_control     np.ndarray      success rates of the control arm
+    p_treatment   np.ndarray      success rates of the treatment arm
+    allocation    np.ndarray      share of the total sample in the treatment arm,
+                                  default is 0.5
+    power         float           target power, default is 0.8
+    alpha         float           significance level, default is 0.05
+    alternative   str             "two-sided", "larger" or "smaller", default is "two-sided"
+
+    Returns:
+    np.ndarray    total sample size of every scenario, rounded up
+    """
+    z_crit = _critical_value(alpha, alternative)
+    z_power = stats.norm.ppf(power)
+    p_control, p_treatment = np.asarray(p_control), np.asarray(p_treatment)
+    share_t = np.asarray(allocation)
+    share_c = 1 - share_t
+
+    p_pooled = share_c * p_control + share_t * p_treatment
+    sd_null = np.sqrt(p_pooled * (1 - p_pooled) * (1 / share_c + 1 / share_t))
+    sd_alt = np.sqrt(
+        p_control * (1 - p_control) / share_c
+        + p_treatment * (1 - p_treatment) / share_t
+    )
+    diff = p_treatment - p_control
+    with np.errstate(divide="ignore"):
+        n_total = ((z_crit * sd_null + z_power * sd_alt) / diff) ** 2
+    if alternative == "larger":
+        n_total = np.where(diff > 0, n_total, np.inf)
+    elif alternative == "smaller":
+        n_total = np.where(diff < 0, n_total, np.inf)
+    return np.ceil(n_total)
+
+
+def _simulation_chunk(
+    task: Tuple[
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+        float,
+        str,
+        int,
+        np.random.SeedSequence,
+    ],
+) -> np.ndarray:
+    """
+    Simulated power of one chunk of scenarios. Success counts of both arms
+    are drawn as binomial matrices (simulations x scenarios) and the pooled
+    two-proportion z-test is applied to all of them at once.
+
+    Parameters:
+    task    tuple of (p_control, p_treatment, n_control, n_treatment, z_crit,
+            alternative, n_simulations, seed_seq):
+            p_control      success rates of the control arm per scenario
+            p_treatment    success rates of the treatment arm per scenario
+            n_control      sizes of the control arm per scenario
+            n_treatment    sizes of the treatment arm per scenario
+            z_crit         critical value of the z-test
+            alternative    "two-sided", "larger" or "smaller"
+            n_simulations  number of simulated experiments per scenario
+            seed_seq       seed sequence dedicated to the chunk
+
+    Returns:
+    1D array with the share of rejections per scenario.
+    """
+    (
+        p_control,
+        p_treatment,
+        n_control,
+        n_treatment,
+        z_crit,
+        alternative,
+        n_simulations,
+        seed_seq,
+    ) = task
+    rng = np.random.default_rng(seed_seq)
+    shape = (n_simulations, len(p_control))
+
+    successes_c = rng.binomial(n_control, p_control, size=shape)
+    successes_t = rng.binomial(n_treatment, p_treatment, size=shape)
+
+    p_pooled = (successes_c + successes_t) / (n_control + n_treatment)
+    se = np.sqrt(p_pooled * (1 - p_pooled) * (1 / n_control + 1 / n_treatment))
+    diff = successes_t / n_treatment - successes_c / n_control
+    # no successes (or no failures) in both arms - the test does not reject
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_stat = np.where(se > 0, diff / se, 0.0)
+    return _rejects(z_stat, z_crit, alternative).mean(axis=0)
+
+
+def power_surface(
+    baseline: Dict[str, float],
+    mdes: Sequence[float],
+    sample_sizes: Sequence[int],
+    allocations: Sequence[float] = (0.5,),
+    relative: bool = False,
+    alpha: float = 0.05,
+    alternative: str = "two-sided",
+    n_simulations: int = 2000,
+    seed: int = 2024,
+    max_chunk_mb: float = 64.0,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """
+    Power of a retention A/B test for every combination of metric, minimum
+    detectable effect (MDE), allocation and total sample size, analytically
+    and by Monte-Carlo simulation.
+
+    Scenarios of the grid are simulated in memory-bounded chunks: success
+    counts of all scenarios of a chunk are drawn as binomial matrices and
+    tested at once. Every chunk has its own seed spawned from the seed, so
+    results are the same for any n_jobs.
+
+    Parameters:
+    baseline        dict            metric -> control success rate,
+                                    e.g. baseline_rates(ab_test_agg)
+    mdes            list            effects (treatment - control) to detect, absolute
+                                    (e.g. -0.005) or relative (e.g. -0.02 for -2%)
+    sample_sizes    list            total sample sizes of both arms
+    allocations     list            shares of the total sample in the treatment arm,
+                                    default is (0.5,)
+    relative        bool            MDEs are relative to the baseline rate, default is False
+    alpha           float           significance level, default is 0.05
+    alternative     str             "two-sided", "larger" or "smaller",
+                                    default is "two-sided"
+    n_simulations   int             simulated experiments per scenario, 0 - analytic
+                                    power only; default is 2000
+    seed            int             seed for reproducibility, default is 2024
+    max_chunk_mb    float           memory limit for one chunk of scenarios in MB,
+                                    default is 64
+    n_jobs          int             number of worker processes, default is 1 (no pool)
+
+    Returns:
+    surface_df      pd.DataFrame    one row per scenario: "metric", "baseline", "mde",
+                                    "allocation", "n_total", "n_control",
+                                    "n_treatment", "p_treatment", "power_analytic",
+                                    "power_simulated" and its Monte-Carlo standard
+                                    error "power_simulated_se"
+    """
+    z_crit = _critical_value(alpha, alternative)
+    surface_df = pd.DataFrame(
+        [
+            (metric, rate, mde, allocation, n_total)
+            for (metric, rate), mde, allocation, n_total in product(
+                baseline.items(), mdes, allocations, sample_sizes
+            )
+        ],
+        columns=["metric", "baseline", "mde", "allocation", "n_total"],
+    )
+
+    p_control = surface_df["baseline"].to_numpy()
+    mde = surface_df["mde"].to_numpy(dtype=float)
+    p_treatment = p_control * (1 + mde) if relative else p_control + mde
+    if ((p_treatment < 0) | (p_treatment > 1)).any():
+        raise ValueError("Treatment rates (baseline + MDE) must be between 0 and 1.")
+
+    n_total = surface_df["n_total"].to_numpy(dtype=np.int64)
+    n_treatment = np.rint(n_total * surface_df["allocation"].to_numpy()).astype(
+        np.int64
+    )
+    n_control = n_total - n_treatment
+    if ((n_control < 1) | (n_treatment < 1)).any():
+        raise ValueError("Every arm must have at least one unit.")
+
+    surface_df["n_control"] = n_control
+    surface_df["n_treatment"] = n_treatment
+    surface_df["p_treatment"] = p_treatment
+    surface_df["power_analytic"] = analytic_power(
+        p_control, p_treatment, n_control, n_treatment, alpha, alternative
+    )
+
+    if n_simulations > 0:
+        # two count matrices, pooled rate, standard error, difference, z
+        row_bytes = n_simulations * 8 * 6
+        chunk_size = rows_per_chunk(max_chunk_mb, row_bytes)
+        sizes = chunk_sizes(len(surface_df), chunk_size)
+        bounds = np.cumsum([0] + sizes)
+        tasks = [
+            (
+                p_control[start:end],
+                p_treatment[start:end],
+                n_control[start:end],
+                n_treatment[start:end],
+                z_crit,
+                alternative,
+                n_simulations,
+                chunk_seed,
+            )
+            for start, end, chunk_seed in zip(
+                bounds[:-1], bounds[1:], np.random.SeedSequence(seed).spawn(len(sizes))
+            )
+        ]
+
+        if n_jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                chunks = list(executor.map(_simulation_chunk, tasks))
+        else:
+            chunks = [_simulation_chunk(task) for task in tasks]
+
+        power = np.concatenate(chunks)
+        surface_df["power_simulated"] = power
+        surface_df["power_simulated_se"] = np.sqrt(power * (1 - power) / n_simulations)
+
+    return surface_df
+
+
+def minimum_sample_size(
+    surface_df: pd.DataFrame,
+    target_powers: Sequence[float] = (0.8, 0.9),
+    power_col: Optional[str] = None,
+    alpha: float = 0.05,
+    alternative: str = "two-sided",
+) -> pd.DataFrame:
+    """
+    Minimum total sample size per target power for every metric, MDE and
+    allocation of a power surface.
+
+    Parameters:
+    surface_df      pd.DataFrame    output of power_surface
+    target_powers   list            target powers, default is (0.8, 0.9)
+    power_col       str             power column to read ("power_simulated" or
+                                    "power_analytic"), default is None -
+                                    "power_simulated" if the surface was simulated,
+                                    else "power_analytic"
+    alpha           float           significance level of the surface, default is 0.05
+    alternative     str             alternative of the surface, default is "two-sided"
+
+    Returns:
+    sizes_df        pd.DataFrame    "metric", "baseline", "mde", "allocation",
+                                    "target_power", "n_total" - the smallest sample
+                                    size of the grid reaching the target power (NaN
+                                    if none does) and "n_total_analytic" - sample
+                                    size from the normal approximation formula
+    """
+    if power_col is None:
+        power_col = (
+            "power_simulated"
+            if "power_simulated" in surface_df.columns
+            else "power_analytic"
+        )
+    if power_col not in surface_df.columns:
+        raise ValueError(
+            f"Power surface has no '{power_col}' column (surfaces built with "
+            "n_simulations=0 have only 'power_analytic')."
+        )
+
+    keys = ["metric", "baseline", "mde", "allocation"]
+    scenarios = surface_df.groupby(keys, sort=False)["p_treatment"].first()
+    scenarios = scenarios.reset_index()
+
+    frames = []
+    for target in target_powers:
+        reached = surface_df.loc[surface_df[power_col] >= target]
+        n_min = reached.groupby(keys, sort=False)["n_total"].min()
+        frame = scenarios[keys].assign(target_power=target)
+        frame["n_total"] = n_min.reindex(
+            pd.MultiIndex.from_frame(scenarios[keys])
+        ).to_numpy()
+        frame["n_total_analytic"] = analytic_sample_size(
+            scenarios["baseline"].to_numpy(),
+            scenarios["p_treatment"].to_numpy(),
+            scenarios["allocation"].to_numpy(),
+            target,
+            alpha,
+            alternative,
+        )
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True)
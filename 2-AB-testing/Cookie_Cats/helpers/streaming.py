@@ -0,0 +1,372 @@
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.proportion import proportions_ztest
+
+
+def _log_likelihood_ratio(
+    theta_hat: np.ndarray, variance: np.ndarray, tau: float
+) -> np.ndarray:
+    """
+    Logarithm of the mSPRT mixture likelihood ratio (0 where variance <= 0).
+    """
+    tau2 = tau**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ratio = 0.5 * np.log(variance / (variance + tau2)) + (
+            tau2 * theta_hat**2 / (2 * variance * (variance + tau2))
+        )
+    return np.where(variance > 0, np.minimum(log_ratio, 700.0), 0.0)
+
+
+def msprt_likelihood_ratio(theta_hat: float, variance: float, tau: float) -> float:
+    """
+    Mixture likelihood ratio of the mSPRT (normal mixing distribution N(0, tau²))
+    for the difference of two means.
+
+    Parameters:
+    theta_hat   observed difference of means (treatment - control)
+    variance    variance of the observed difference
+    tau         standard deviation of the mixing distribution
+
+    Returns:
+    Likelihood ratio in favour of a non-zero difference.
+    """
+    return float(np.exp(_log_likelihood_ratio(theta_hat, variance, tau)))
+
+
+def _binary_moments(
+    successes: np.ndarray, counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Difference of rates (treatment - control), its variance and pooled
+    standard deviation from successes and counts (... x arms).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = successes / counts
+        variance = (rates * (1 - rates) / counts).sum(axis=-1)
+        p_pooled = successes.sum(axis=-1) / counts.sum(axis=-1)
+    pooled_std = np.sqrt(p_pooled * (1 - p_pooled))
+    return rates[..., 1] - rates[..., 0], variance, pooled_std
+
+
+def _continuous_moments(
+    means: np.ndarray, m2: np.ndarray, counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Difference of means (treatment - control), its variance and pooled
+    standard deviation from means, sums of squared deviations and counts
+    (... x arms).
+    """
+    variances = m2 / np.maximum(counts - 1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (variances / counts).sum(axis=-1)
+    pooled_std = np.sqrt(variances.mean(axis=-1))
+    return means[..., 1] - means[..., 0], variance, pooled_std
+
+
+class StreamingABTest:
+    """
+    Incremental A/B test accumulator, which keeps O(1) sufficient statistics
+    per arm (count, successes of binary metrics, mean and sum of squared
+    deviations of continuous metrics, merged with Chan's parallel update) and
+    answers interim reads without rescanning history.
+
+    Rows can be added one by one (update_row) or in chunks (update, consume),
+    e.g. from pd.read_csv(..., chunksize=...).
+
+    Always-valid p-values are computed with the mixture sequential probability
+    ratio test (mSPRT) after every row (for all rows of a chunk at once) and
+    are kept as a running minimum, so they can be monitored continuously
+    without inflating the false positive rate and do not depend on how the
+    stream is split into chunks.
+    """
+
+    def __init__(
+        self,
+        group_col: str = "version",
+        control: str = "gate_30",
+        treatment: str = "gate_40",
+        binary_metrics: Sequence[str] = ("retention_1", "retention_7"),
+        continuous_metrics: Sequence[str] = ("sum_gamerounds",),
+        expected_ratio: Tuple[float, float] = (0.5, 0.5),
+        tau: Optional[Dict[str, float]] = None,
+        tau_burn_in: int = 1000,
+    ) -> None:
+        """
+        Parameters:
+        group_col           column with arm labels
+        control             label of the control arm
+        treatment           label of the treatment arm
+        binary_metrics      0/1 metric columns (e.g. retention flags)
+        continuous_metrics  numeric metric columns (e.g. total gamerounds)
+        expected_ratio      expected shares of control and treatment for the
+                            sample ratio check, default is (0.5, 0.5)
+        tau                 metric -> standard deviation of the mSPRT mixing
+                            distribution; default is 0.01 for binary metrics; for
+                            continuous metrics without tau see tau_burn_in
+        tau_burn_in         rows per arm of the burn-in of continuous metrics
+                            without tau: tau is fixed to 10% of the pooled standard
+                            deviation at the first row where both arms have
+                            tau_burn_in rows, and always-valid p-values of the
+                            metric start after it; default is 1000
+        """
+        self.group_col = group_col
+        self.arms = (control, treatment)
+        self.binary_metrics = list(binary_metrics)
+        self.continuous_metrics = list(continuous_metrics)
+        self.expected_ratio = np.asarray(expected_ratio, dtype=float)
+        self.tau = {metric: 0.01 for metric in self.binary_metrics}
+        self.tau.update(tau or {})
+        self.tau_burn_in = tau_burn_in
+
+        n_arms = len(self.arms)
+        self.counts = np.zeros(n_arms, dtype=np.int64)
+        self.successes = np.zeros((n_arms, len(self.binary_metrics)), dtype=np.int64)
+        self.means = np.zeros((n_arms, len(self.continuous_metrics)), dtype=float)
+        self.m2 = np.zeros((n_arms, len(self.continuous_metrics)), dtype=float)
+        self._always_valid_p = {
+            metric: 1.0 for metric in self.binary_metrics + self.continuous_metrics
+        }
+
+    def _arm_index(self, labels: Iterable[Any]) -> np.ndarray:
+        """
+        Maps arm labels to positions in the statistics arrays.
+        """
+        labels = pd.Index(labels)
+        idx = labels.map({arm: i for i, arm in enumerate(self.arms)})
+        if idx.isna().any():
+            unknown = sorted(set(labels[idx.isna()].astype(str)))
+            raise ValueError(f"Unknown arms in '{self.group_col}': {unknown}")
+        return idx.to_numpy(dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame) -> "StreamingABTest":
+        """
+        Adds a chunk of rows to the sufficient statistics.
+
+        Parameters:
+        chunk    pd.DataFrame with group column and metric columns
+
+        Returns:
+        self, so calls can be chained.
+        """
+        if chunk.empty:
+            return self
+        return self._add(
+            self._arm_index(chunk[self.group_col]),
+            chunk[self.binary_metrics].to_numpy(dtype=float),
+            chunk[self.continuous_metrics].to_numpy(dtype=float),
+        )
+
+    def update_row(self, row: Dict[str, Any]) -> "StreamingABTest":
+        """
+        Adds a single event (dict with group column and metric values).
+        """
+        return self._add(
+            self._arm_index([row[self.group_col]]),
+            np.array([[row[metric] for metric in self.binary_metrics]], dtype=float),
+            np.array(
+                [[row[metric] for metric in self.continuous_metrics]], dtype=float
+            ),
+        )
+
+    def consume(self, chunks: Iterable[pd.DataFrame]) -> "StreamingABTest":
+        """
+        Adds all chunks of an iterable, e.g. pd.read_csv(path, chunksize=10000).
+        """
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def _validate(self, binary: np.ndarray, continuous: np.ndarray) -> None:
+        """
+        Rejects missing values of all metrics and values other than 0/1 of
+        binary metrics (before any statistics change).
+        """
+        metrics = self.binary_metrics + self.continuous_metrics
+        values = np.hstack([binary, continuous])
+        missing = [m for m, col in zip(metrics, values.T) if np.isnan(col).any()]
+        if missing:
+            raise ValueError(f"Missing values in metrics: {missing}")
+        non_binary = [
+            metric
+            for metric, col in zip(self.binary_metrics, binary.T)
+            if not np.isin(col, (0, 1)).all()
+        ]
+        if non_binary:
+            raise ValueError(f"Values other than 0/1 in binary metrics: {non_binary}")
+
+    def _add(
+        self, arm_idx: np.ndarray, binary: np.ndarray, continuous: np.ndarray
+    ) -> "StreamingABTest":
+        """
+        Adds rows (arm indices, binary and continuous metric values). Statistics
+        after every row are computed with cumulative sums (rows x arms), the
+        last row becomes the new state.
+        """
+        self._validate(binary, continuous)
+        n_arms = len(self.arms)
+        in_arm = (arm_idx[:, None] == np.arange(n_arms)).astype(np.int64)
+        counts = self.counts + np.cumsum(in_arm, axis=0)
+        moments = {}
+
+        successes = self.successes[None, :, :] + np.cumsum(
+            in_arm[:, :, None] * binary.astype(np.int64)[:, None, :], axis=0
+        )
+        for j, metric in enumerate(self.binary_metrics):
+            moments[metric] = _binary_moments(successes[:, :, j], counts)
+
+        # deviations from the running mean of the arm (chunk mean for empty arms)
+        chunk_counts = in_arm.sum(axis=0)
+        chunk_means = (in_arm.T @ continuous) / np.maximum(chunk_counts, 1)[:, None]
+        shift = np.where(self.counts[:, None] > 0, self.means, chunk_means)
+        deviations = in_arm[:, :, None] * (continuous[:, None, :] - shift[None, :, :])
+        old_offset = (self.means - shift) * self.counts[:, None]
+        total = old_offset + np.cumsum(deviations, axis=0)
+        squares = (
+            self.m2
+            + old_offset * (self.means - shift)
+            + np.cumsum(deviations**2, axis=0)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = shift + total / counts[:, :, None]
+            m2 = np.maximum(squares - total**2 / counts[:, :, None], 0.0)
+        for j, metric in enumerate(self.continuous_metrics):
+            moments[metric] = _continuous_moments(means[:, :, j], m2[:, :, j], counts)
+
+        self._update_always_valid_p(counts, moments)
+
+        filled = counts[-1] > 0
+        self.counts = counts[-1]
+        self.successes = successes[-1]
+        self.means[filled] = means[-1][filled]
+        self.m2[filled] = m2[-1][filled]
+        return self
+
+    def _difference_and_variance(self, metric: str) -> Tuple[float, float, float]:
+        """
+        Returns difference of means (treatment - control), its variance and
+        pooled standard deviation of the metric.
+        """
+        if metric in self.binary_metrics:
+            j = self.binary_metrics.index(metric)
+            moments = _binary_moments(self.successes[:, j], self.counts)
+        else:
+            j = self.continuous_metrics.index(metric)
+            moments = _continuous_moments(self.means[:, j], self.m2[:, j], self.counts)
+        return tuple(float(value) for value in moments)
+
+    def _update_always_valid_p(
+        self,
+        counts: np.ndarray,
+        moments: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    ) -> None:
+        """
+        Updates running minimum of mSPRT p-values of all metrics over the rows
+        of a chunk (counts and moments after every row). tau of a continuous
+        metric without tau is fixed at the end of its burn-in.
+        """
+        valid = (counts >= 2).all(axis=1)
+        for metric, (theta_hat, variance, pooled_std) in moments.items():
+            if metric not in self.tau:
+                burned_in = (counts >= self.tau_burn_in).all(axis=1) & (pooled_std > 0)
+                if not burned_in.any():
+                    continue
+                first = int(np.argmax(burned_in))
+                self.tau[metric] = 0.1 * float(pooled_std[first])
+                valid = valid & (np.arange(len(counts)) >= first)
+            if not valid.any():
+                continue
+            log_ratio = _log_likelihood_ratio(
+                theta_hat[valid], variance[valid], self.tau[metric]
+            )
+            self._always_valid_p[metric] = min(
+                self._always_valid_p[metric], float(np.exp(-log_ratio.max()))
+            )
+
+    def msprt_pvalue(self, metric: str) -> float:
+        """
+        Current (point in time) mSPRT p-value, i.e. min(1, 1 / likelihood ratio);
+        1 before the burn-in of a continuous metric without tau.
+        """
+        if metric not in self.tau:
+            return 1.0
+        theta_hat, variance, _ = self._difference_and_variance(metric)
+        return min(
+            1.0, 1.0 / msprt_likelihood_ratio(theta_hat, variance, self.tau[metric])
+        )
+
+    def always_valid_pvalue(self, metric: str) -> float:
+        """
+        Always-valid p-value of the metric (running minimum over all rows).
+        """
+        return self._always_valid_p[metric]
+
+    def sample_ratio_check(self) -> Tuple[float, float]:
+        """
+        Chi-square test of observed arm sizes against expected allocation ratio.
+
+        Returns:
+        chi2_stat, p_value
+        """
+        expected = self.counts.sum() * self.expected_ratio / self.expected_ratio.sum()
+        chi2_stat, p_value = stats.chisquare(self.counts, expected)
+        return float(chi2_stat), float(p_value)
+
+    def ztest(self, metric: str) -> Tuple[float, float]:
+        """
+        Fixed-horizon z-test for proportions of a binary metric (treatment vs control).
+
+        Returns:
+        z_stat, p_value
+        """
+        j = self.binary_metrics.index(metric)
+        z_stat, p_value = proportions_ztest(self.successes[::-1, j], self.counts[::-1])
+        return float(z_stat), float(p_value)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per-arm summary in the layout of ab_test_agg in the notebook
+        (total_count, rates of binary metrics, means and std of continuous metrics).
+        """
+        summary = pd.DataFrame({"total_count": self.counts}, index=list(self.arms))
+        for j, metric in enumerate(self.binary_metrics):
+            summary[f"{metric}_rate"] = self.successes[:, j] / self.counts
+        for j, metric in enumerate(self.continuous_metrics):
+            summary[f"{metric}_mean"] = self.means[:, j]
+            summary[f"{metric}_std"] = np.sqrt(
+                self.m2[:, j] / np.maximum(self.counts - 1, 1)
+            )
+        summary.index.name = self.group_col
+        return summary
+
+    def report(self) -> pd.DataFrame:
+        """
+        Interim read of all metrics: difference of means, fixed-horizon p-value
+        (z-test for binary, Welch's z approximation for continuous metrics) and
+        always-valid mSPRT p-value. Sample ratio check is added as attributes.
+        """
+        rows = []
+        for metric in self.binary_metrics + self.continuous_metrics:
+            theta_hat, variance, _ = self._difference_and_variance(metric)
+            if metric in self.binary_metrics:
+                z_stat, p_value = self.ztest(metric)
+            else:
+                z_stat = theta_hat / np.sqrt(variance)
+                p_value = 2 * stats.norm.sf(abs(z_stat))
+            rows.append(
+                {
+                    "metric": metric,
+                    "difference": theta_hat,
+                    "z_stat": z_stat,
+                    "p_value": p_value,
+                    "always_valid_p_value": self.always_valid_pvalue(metric),
+                }
+            )
+
+        report = pd.DataFrame(rows).set_index("metric")
+        report.attrs["srm_chi2"], report.attrs["srm_p_value"] = (
+            self.sample_ratio_check()
+        )
+        return report
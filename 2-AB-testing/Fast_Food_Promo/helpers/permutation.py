@@ -0,0 +1,222 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from shared_helpers.chunking import chunk_sizes, rows_per_chunk
+
+
+def _group_statistics(
+    labels: np.ndarray,
+    unit_sums: np.ndarray,
+    unit_counts: np.ndarray,
+    total_squares: float,
+    n_groups: int,
+) -> np.ndarray:
+    """
+    ANOVA F and pairwise differences of group means for every row of a
+    label matrix (permutations x units), from group sums computed with bincount.
+
+    Returns:
+    2D array (permutations x (1 + number of pairs)): F, then mean differences
+    of pairs in the order of itertools.combinations(range(n_groups), 2).
+    """
+    n_rows = labels.shape[0]
+    flat = (np.arange(n_rows)[:, None] * n_groups + labels).ravel()
+    size = n_rows * n_groups
+    sums = np.bincount(
+        flat, weights=np.broadcast_to(unit_sums, labels.shape).ravel(), minlength=size
+    ).reshape(n_rows, n_groups)
+    counts = np.bincount(
+        flat, weights=np.broadcast_to(unit_counts, labels.shape).ravel(), minlength=size
+    ).reshape(n_rows, n_groups)
+
+    n_total = unit_counts.sum()
+    between = (sums**2 / counts).sum(axis=1)
+    ss_between = between - unit_sums.sum() ** 2 / n_total
+    ss_within = total_squares - between
+    f_stat = (ss_between / (n_groups - 1)) / (ss_within / (n_total - n_groups))
+
+    means = sums / counts
+    pairs = list(combinations(range(n_groups), 2))
+    differences = np.column_stack([means[:, a] - means[:, b] for a, b in pairs])
+    return np.column_stack([f_stat, differences])
+
+
+def _permutation_chunk(
+    task: Tuple[
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+        float,
+        int,
+        int,
+        np.random.SeedSequence,
+    ],
+) -> np.ndarray:
+    """
+    Statistics of one chunk of permutations. Labels are shuffled within
+    blocks: units are ordered by block code plus a uniform random key, so every
+    permutation row is a random order of units inside each block.
+
+    Parameters:
+    task    tuple of (labels, block_codes, unit_sums, unit_counts, total_squares,
+            n_groups, n_rows, seed_seq):
+            labels         group codes of units sorted by block
+            block_codes    block codes of units (sorted)
+            unit_sums      outcome sums of units
+            unit_counts    number of rows of units
+            total_squares  sum of squared outcomes of all rows
+            n_groups       number of groups
+            n_rows         number of permutations in the chunk
+            seed_seq       seed sequence dedicated to the chunk
+
+    Returns:
+    2D array (permutations x statistics).
+    """
+    (
+        labels,
+        block_codes,
+        unit_sums,
+        unit_counts,
+        total_squares,
+        n_groups,
+        n_rows,
+        seed_seq,
+    ) = task
+    rng = np.random.default_rng(seed_seq)
+
+    keys = block_codes + rng.random((n_rows, len(labels)))
+    permuted = labels[np.argsort(keys, axis=1)]
+    return _group_statistics(permuted, unit_sums, unit_counts, total_squares, n_groups)
+
+
+def permutation_test(
+    df: pd.DataFrame,
+    outcome: str = "SalesInThousands",
+    group_col: str = "Promotion",
+    block: Optional[str] = "MarketID",
+    unit: Optional[str] = "LocationID",
+    n_permutations: int = 10000,
+    seed: int = 2024,
+    max_chunk_mb: float = 64.0,
+    n_jobs: int = 1,
+    return_null: bool = False,
+) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Blocked permutation (randomization) test of a multi-arm experiment:
+    ANOVA F of all arms and differences of means of every pair of arms.
+
+    Arm labels are shuffled between randomization units (e.g. locations - all
+    weeks of a location move together, so week structure is kept) within
+    blocks (e.g. markets or market sizes). Permutations are generated as label
+    matrices in memory-bounded chunks and group sums of all permutations of a
+    chunk are computed with one bincount. Every chunk has its own seed spawned
+    from the seed, so results are the same for any n_jobs.
+
+    Parameters:
+    df              pd.DataFrame    data of the experiment (one row per unit and week)
+    outcome         str             outcome column, default is "SalesInThousands"
+    group_col       str             column with arm labels, default is "Promotion"
+    block           str             column with blocks (e.g. "MarketID", "MarketSize"),
+                                    None - no blocking; default is "MarketID"
+    unit            str             column with randomization units, None - rows are
+                                    permuted individually; default is "LocationID"
+    n_permutations  int             number of permutations, default is 10000
+    seed            int             seed for reproducibility, default is 2024
+    max_chunk_mb    float           memory limit for one chunk of permutations in MB,
+                                    default is 64
+    n_jobs          int             number of worker processes, default is 1 (no pool)
+    return_null     bool            also return permutation distributions, default is False
+
+    Returns:
+    results_df      pd.DataFrame    "Statistic", "Observed", "p-value" for the ANOVA F
+                                    and for every pair of arms ("1 - 2" etc.);
+                                    p-values are (1 + extreme count) / (1 + n_permutations),
+                                    two-sided for mean differences
+    null_df         pd.DataFrame    permutations x statistics (only if return_null)
+    """
+    data = df[[outcome, group_col] + [c for c in (block, unit) if c]].copy()
+    data["_unit"] = np.arange(len(data)) if unit is None else data[unit]
+    data["_block"] = 0 if block is None else data[block]
+
+    units = data.groupby("_unit", sort=True).agg(
+        group=(group_col, "first"),
+        n_groups=(group_col, "nunique"),
+        block=("_block", "first"),
+        n_blocks=("_block", "nunique"),
+        sum=(outcome, "sum"),
+        count=(outcome, "size"),
+    )
+    if (units["n_groups"] > 1).any():
+        raise ValueError(f"Units in '{unit}' have more than one '{group_col}' label.")
+    if (units["n_blocks"] > 1).any():
+        raise ValueError(f"Units in '{unit}' belong to more than one '{block}' block.")
+
+    group_labels, group_codes = np.unique(units["group"], return_inverse=True)
+    _, block_codes = np.unique(units["block"], return_inverse=True)
+    order = np.argsort(block_codes, kind="stable")
+
+    labels = group_codes[order]
+    block_codes = block_codes[order].astype(float)
+    unit_sums = units["sum"].to_numpy(dtype=float)[order]
+    unit_counts = units["count"].to_numpy(dtype=float)[order]
+    total_squares = float((data[outcome].to_numpy(dtype=float) ** 2).sum())
+    n_groups = len(group_labels)
+
+    observed = _group_statistics(
+        labels[None, :], unit_sums, unit_counts, total_squares, n_groups
+    )[0]
+
+    row_bytes = len(labels) * 40
+    chunk_size = rows_per_chunk(max_chunk_mb, row_bytes)
+    sizes = chunk_sizes(n_permutations, chunk_size)
+    tasks = [
+        (
+            labels,
+            block_codes,
+            unit_sums,
+            unit_counts,
+            total_squares,
+            n_groups,
+            n_rows,
+            chunk_seed,
+        )
+        for n_rows, chunk_seed in zip(
+            sizes, np.random.SeedSequence(seed).spawn(len(sizes))
+        )
+    ]
+
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            chunks = list(executor.map(_permutation_chunk, tasks))
+    else:
+        chunks = [_permutation_chunk(task) for task in tasks]
+    null = np.vstack(chunks)
+
+    # small tolerance so that permutations equal to the observed labeling count
+    tolerance = 1e-12 * np.maximum(np.abs(observed), 1)
+    extreme = np.empty(len(observed))
+    extreme[0] = (null[:, 0] >= observed[0] - tolerance[0]).sum()
+    extreme[1:] = (np.abs(null[:, 1:]) >= np.abs(observed[1:]) - tolerance[1:]).sum(
+        axis=0
+    )
+
+    names = ["ANOVA F"] + [
+        f"{group_labels[a]} - {group_labels[b]}"
+        for a, b in combinations(range(n_groups), 2)
+    ]
+    results_df = pd.DataFrame(
+        {
+            "Statistic": names,
+            "Observed": observed,
+            "p-value": (1 + extreme) / (1 + n_permutations),
+        }
+    )
+
+    if return_null:
+        return results_df, pd.DataFrame(null, columns=names)
+    return results_df
@@ -1,148 +1,27 @@
-import pandas as pd
-import plotly.express as px
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.graph_objs import Figure
-from IPython.display import Image, Markdown, display
-from plotly.subplots import make_subplots
-
-
-def fig_px_render(fig_input: Figure, method: str, fig_name: str = "figure") -> None:
-    """
-    Render a Plotly figure based on the specified method.
-
-    Parameters:
-    - fig_input: Plotly Figure object to render.
-    - method: The method of rendering ('export', 'github', or 'interactive').
-    - name: Optional name for the saved image file (default is "figure").
-
-    The function saves the figure as an image, displays the image,
-    or shows the interactive figure based on the specified method.
-    """
-
-    image_file = f"images/{fig_name}.png"
-
-    if method == "export":
-        fig_input.write_image(image_file, engine="kaleido")
-    elif method == "github":
-        display(Image(image_file))
-    elif method == "interactive":
-        fig_input.show()
-
-
-def fig_update(
-    fig,
-    plot_title: str,
-    plot_subtitle: str,
-    x_title: str,
-    y_title: str,
-    legend_title: str = "Legend",
-    plot_width: int = 1000,
-    plot_height: int = 400,
-) -> Figure:
-    """
-    The function conveniently updates most of plots drawn by
-    plotly.express with:
-
-    Parameters:
-    - fig: Plotly Figure object to update.
-    - plot_title: Title of the plot.
-    - plot_subtitle: Subtitle of the plot.
-    - x_title: Title of the x-axis.
-    - y_title: Title of the y-axis.
-    - legend_title: Title for the legend (default is "Legend").
-    - plot_width: width of the plot (default is 1000).
-    - plot_height: height of the plot (default is 400).
-
-    Returns:
-    - Updated Plotly Figure object.
-    """
-    fig.update_layout(
-        title_text=plot_title,
-        title_x=0.5,
-        title_font_size=20,
-        annotations=[
-            dict(
-                text=plot_subtitle,
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=-0.27,
-                showarrow=False,
-                font=dict(size=16, color="black"),
-            )
-        ],
-        xaxis_title=x_title,
-        yaxis_title=y_title,
-        legend_title_text=legend_title,
-        autosize=False,
-        width=plot_width,
-        height=plot_height,
-    )
-    return fig
-
-
-def any_outliers_iqr(
-    df: pd.DataFrame, col_name: str, print_flag: bool = True
-) -> pd.DataFrame:
-    """
-    This function uses IQR method for identification of outliers in a column of DataFrame.
-
-    Parameters:
-    df          pd.DataFrame    The DataFrame where we are looking for outliers
-    col_name    str             column of the DataFrame in which we are looking for outliers
-    print_flag  bool            flag, indicating whether to print outlier information
-
-    Returns:
-    df_outliers pd.DataFrame    Prints text message for user if there are any top or bottom
-                                outliers in the specified column. Returns a DataFrame with
-                                all outliers from initial DataFrame.
-    """
-    df_outliers = pd.DataFrame()
-
-    min_value = df[col_name].min()
-    max_value = df[col_name].max()
-
-    q1 = df[col_name].quantile(0.25)
-    q3 = df[col_name].quantile(0.75)
-
-    iqr = q3 - q1
-
-    bottom_limit = round(q1 - 1.5 * iqr, 6)
-    top_limit = round(q3 + 1.5 * iqr, 6)
-
-    if bottom_limit <= min_value and top_limit >= max_value:
-        print(f"There are no outliers in '{col_name}'.") if print_flag else None
+import hashlib
+from collections import OrderedDict
 
-    if bottom_limit > min_value:
-        lower_rows = df[df[col_name] < bottom_limit]
-        lower_count = lower_rows.shape[0]
-        (
-            print(
-                f"There are {int(lower_count)} bottom outliers in '{col_name}' below {bottom_limit}"
-            )
-            if print_flag
-            else None
-        )
-        df_outliers = pd.concat([df_outliers, lower_rows])
-
-    if top_limit < max_value:
-        upper_rows = df[df[col_name] > top_limit]
-        upper_count = upper_rows.shape[0]
-        (
-            print(
-                f"There are {int(upper_count)} top outliers in '{col_name}' above {top_limit}"
-            )
-            if print_flag
-            else None
-        )
-
-        df_outliers = pd.concat([df_outliers, upper_rows])
-
-    df_output = df_outliers.sort_values(by=col_name, ascending=False)
+import numpy as np
+import pandas as pd
 
-    return df_output
+from shared_helpers import plotting
+from shared_helpers.display import show
+
+# shared helpers re-exported for "from helpers.<module> import *" in notebooks
+from shared_helpers.outliers import (  # noqa: F401
+    OUTLIER_RULES,
+    any_outliers_iqr,
+    iqr_bounds,
+    mad_bounds,
+    outliers_all_columns,
+    zscore_bounds,
+)
+from shared_helpers.plotting import (  # noqa: F401
+    fig_px_render,
+    fig_update,
+    flush_render_queue,
+    hist_box_traces_aggregated,
+)
 
 
 def hist_box_eda(
@@ -156,9 +35,11 @@ def hist_box_eda(
     custom_low=0.00,
     custom_high=0.00,
     custom_flag=False,
+    aggregate=False,
 ):
     """
     The function renders a plotly histogram and prints statistical summary of a feature
+    (shared_helpers.plotting.hist_box_eda with 30 bins and summary in one row)
 
     Parameters:
     df           pandas dataframe
@@ -172,78 +53,178 @@ def hist_box_eda(
     custom_low   custom lower bound for box plot line, default is 0.00
     custom_high  custom upper bound for box plot line, default is 0.00
     custom_flag  boolean flag for adding custom lines, default is 'False'
+    aggregate    flag for large data mode: histogram and box plot are built from bin
+                 counts and quartiles computed in NumPy instead of raw values,
+                 default is 'False'
     """
-    hist = px.histogram(df, x=feature, nbins=30)
-    box = px.box(df, x=feature, orientation="h")
-
-    fig = make_subplots(
-        rows=2, cols=1, shared_xaxes=True, row_heights=[0.9, 0.1], vertical_spacing=0.05
+    plotting.hist_box_eda(
+        df,
+        feature,
+        x_title,
+        sub_title,
+        render_mode,
+        title_mod,
+        stat_print,
+        custom_low,
+        custom_high,
+        custom_flag,
+        aggregate,
+        nbins=30,
+        transpose_summary=True,
     )
 
-    for trace in hist.data:
-        fig.add_trace(trace, row=1, col=1)
-
-    for trace in box.data:
-        fig.add_trace(trace, row=2, col=1)
-
-    if custom_flag:
-        fig.add_vline(x=custom_low, line=dict(color="red"), row=2, col=1)
-        fig.add_vline(x=custom_high, line=dict(color="red"), row=2, col=1)
-        fig.add_trace(
-            go.Scatter(
-                x=[None],
-                y=[custom_low],
-                mode="lines",
-                line=dict(color="red", dash="longdash"),
-                name="typical levels",
-                showlegend=True,
-            )
-        )
 
-    fig.update_xaxes(title_text=x_title, row=2, col=1, title_standoff=0)
-
-    fig_update(
-        fig,
-        f"Distribution of {feature.title() if feature != 'pH' else feature} {title_mod}",
-        f"<i>{sub_title}</i>",
-        "",
-        "Count",
-        "",
-        800,
-        400,
-    )
+class CorrelationEngine:
+    """
+    Cached engine of Pearson and Spearman correlation matrices.
+
+    Columns are standardized (after rank transformation for Spearman) once and
+    correlations are computed with a single matrix product. Every column is
+    cached under a fingerprint of its values (and index), so when columns are
+    dropped or added (or data changes) only correlations of new or changed
+    columns are computed. At most max_columns columns are kept; the least
+    recently used ones are evicted (never the columns of the current call).
+    """
 
-    fig_px_render(fig, render_mode, sub_title.replace(".", ""))
+    def __init__(self, max_columns=256):
+        self.max_columns = max_columns
+        self._vectors = OrderedDict()
+        self._matrix = pd.DataFrame()
+
+    @staticmethod
+    def _column_key(series, method):
+        values_hash = pd.util.hash_pandas_object(series, index=True).to_numpy()
+        digest = hashlib.sha1(values_hash.tobytes()).hexdigest()
+        return f"{method}:{series.name}:{digest}"
+
+    @staticmethod
+    def _standardize(data, method):
+        if method == "spearman":
+            data = data.rank(method="average")
+        values = data.to_numpy(dtype=float)
+        values = values - values.mean(axis=0)
+        norms = np.sqrt((values**2).sum(axis=0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return values / norms
+
+    def matrix(self, df, method="spearman"):
+        """
+        Returns correlation matrix of numeric columns of df ('pearson' or
+        'spearman'), computing only correlations missing in the cache.
+        Columns with missing values fall back to DataFrame.corr.
+        """
+        if method not in ("pearson", "spearman"):
+            raise ValueError(f"Unknown method '{method}', use 'pearson' or 'spearman'.")
+
+        data = df.select_dtypes("number")
+        if data.isna().any().any():
+            return data.corr(method=method)
+
+        keys = [self._column_key(data[col], method) for col in data.columns]
+        self._matrix = self._matrix.reindex(
+            index=self._matrix.index.union(keys, sort=False),
+            columns=self._matrix.index.union(keys, sort=False),
+        )
+        todo = self._matrix.loc[keys, keys].isna().any(axis=1).to_numpy()
 
-    feature_description = pd.DataFrame(df[feature].describe()).round(3)
-    print("\n", feature_description.T, "\n", sep="") if stat_print else None
+        if todo.any():
+            new_cols = [
+                col for key, col in zip(keys, data.columns) if key not in self._vectors
+            ]
+            if new_cols:
+                new_vectors = self._standardize(data[new_cols], method)
+                for col, vector in zip(new_cols, new_vectors.T):
+                    self._vectors[keys[data.columns.get_loc(col)]] = vector
+
+            todo_keys = [key for key, flag in zip(keys, todo) if flag]
+            todo_vectors = np.column_stack([self._vectors[key] for key in todo_keys])
+            all_vectors = np.column_stack([self._vectors[key] for key in keys])
+            cross = todo_vectors.T @ all_vectors
+
+            self._matrix.loc[todo_keys, keys] = cross
+            self._matrix.loc[keys, todo_keys] = cross.T
+
+        corr = self._matrix.loc[keys, keys].to_numpy(dtype=float)
+        self._evict(keys)
+        return pd.DataFrame(corr, index=data.columns, columns=data.columns)
+
+    def _evict(self, keys):
+        """
+        Marks keys as most recently used and removes the least recently used
+        columns above max_columns from the cache.
+        """
+        for key in keys:
+            self._vectors.move_to_end(key)
+        n_stale = len(self._vectors) - max(self.max_columns, len(keys))
+        if n_stale > 0:
+            stale = [self._vectors.popitem(last=False)[0] for _ in range(n_stale)]
+            self._matrix = self._matrix.drop(index=stale, columns=stale)
+
+    def clear(self):
+        """
+        Removes all cached columns and correlations.
+        """
+        self._vectors = OrderedDict()
+        self._matrix = pd.DataFrame()
+
+
+correlation_engine = CorrelationEngine()
+
+
+class StyledCorrBar:
+    """
+    Sorted correlation bar of a column, which builds its styled HTML only when
+    it is displayed (and only once).
+    """
 
+    def __init__(self, corr_col):
+        self.corr_col = corr_col
+        self._html = None
+
+    def __str__(self):
+        col = self.corr_col.columns[0]
+        return self.corr_col.sort_values(by=col, ascending=False).T.round(3).to_string()
+
+    def _repr_html_(self):
+        if self._html is None:
+            col = self.corr_col.columns[0]
+            styled_df = (
+                self.corr_col.sort_values(by=col, ascending=False)
+                .T.style.background_gradient(cmap="coolwarm", axis=None)
+                .format("{:.3f}")
+                .set_table_attributes('style="width: 55%;"')
+                .set_table_styles(
+                    [
+                        {
+                            "selector": "th",
+                            "props": [("white-space", "normal"), ("width", "50px")],
+                        },
+                        {"selector": "td", "props": [("width", "50px")]},
+                    ]
+                )
+            )
+            self._html = styled_df.to_html()
+        return self._html
 
-def corr_bar(df, col):
+
+def corr_bar(df, col, method=None, engine=None):
     """
     The function prints a styled sorted correlation bar with strongest
     positive correlation on the left and strongest negative on the
     right
+
+    Parameters:
+    df      correlation matrix, or data if method is given
+    col     column for which correlations are shown
+    method  'pearson' or 'spearman' - correlations of data in df are read
+            from the correlation engine cache, default is None (df is
+            a correlation matrix)
+    engine  CorrelationEngine, default is the module's correlation_engine
     """
+    if method is not None:
+        df = (engine or correlation_engine).matrix(df, method)
+
     corr_col = pd.DataFrame(df[col])
     corr_col = corr_col.drop(col, axis=0)
 
-    styled_df = (
-        corr_col.sort_values(by=col, ascending=False)
-        .T.style.background_gradient(cmap="coolwarm", axis=None)
-        .format("{:.3f}")
-        .set_table_attributes('style="width: 55%;"')
-        .set_table_styles(
-            [
-                {
-                    "selector": "th",
-                    "props": [("white-space", "normal"), ("width", "50px")],
-                },
-                {"selector": "td", "props": [("width", "50px")]},
-            ]
-        )
-    )
-
-    html = styled_df.to_html()
-
-    display(Markdown(html))
+    show(StyledCorrBar(corr_col))
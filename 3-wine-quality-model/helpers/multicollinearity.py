@@ -0,0 +1,156 @@
+import warnings
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _design(df: pd.DataFrame, center: bool) -> np.ndarray:
+    X = df.to_numpy(dtype=float)
+    if center:
+        X = X - X.mean(axis=0)
+    return X
+
+
+def _collinear_features(df: pd.DataFrame, center: bool) -> List[str]:
+    """
+    Returns columns which are exact linear combinations of the columns before
+    them (constant columns too if center is True), i.e. columns with infinite VIF
+    that make the Gram matrix singular.
+    """
+    X = _design(df, center)
+    independent: List[int] = []
+    collinear = []
+    for j, col in enumerate(df.columns):
+        if np.linalg.matrix_rank(X[:, independent + [j]]) > len(independent):
+            independent.append(j)
+        else:
+            collinear.append(col)
+    return collinear
+
+
+def _gram_inverse(df: pd.DataFrame, center: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns Gram matrix diagonal and inverse of the Gram matrix of df columns
+    (centered columns if center is True - i.e. scaled covariance matrix).
+    Raises ValueError for exactly collinear columns (singular Gram matrix).
+    """
+    collinear = _collinear_features(df, center)
+    if collinear:
+        raise ValueError(
+            f"Features are exact linear combinations of other features: {collinear}"
+        )
+    X = _design(df, center)
+    gram = X.T @ X
+    return np.diag(gram).copy(), np.linalg.inv(gram)
+
+
+def vif_all(df: pd.DataFrame, center: bool = True) -> pd.DataFrame:
+    """
+    This function computes variance inflation factors of all columns at once
+    from the diagonal of the inverse correlation (Gram) matrix,
+    VIF_i = G_ii * (G^-1)_ii, instead of fitting one OLS regression per column.
+
+    Parameters:
+    df          pd.DataFrame    Numeric features
+    center      bool            True - VIF of regressions with intercept (centered data);
+                                False - regressions without constant (uncentered R^2);
+                                for standardized data both equal statsmodels
+                                variance_inflation_factor on df.values
+
+    Returns:
+    vif_data    pd.DataFrame    Columns 'Feature' and 'VIF'
+
+    Raises ValueError if any features are exactly collinear (infinite VIF).
+    """
+    gram_diag, inverse = _gram_inverse(df, center)
+    return pd.DataFrame(
+        {"Feature": df.columns, "VIF": gram_diag * np.diag(inverse)}
+    ).reset_index(drop=True)
+
+
+def vif_elimination(
+    df: pd.DataFrame,
+    threshold: float = 5.0,
+    center: bool = True,
+    keep: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    This function iteratively drops the feature with the highest VIF until all
+    VIFs are at most the threshold. The inverse Gram matrix is computed once and
+    updated after every drop with the Schur complement
+    (A^-1 without feature k = E - f f^T / g, where g = (A^-1)_kk, f = (A^-1)_-k,k).
+    The downdates need a true inverse, so exactly collinear features (infinite
+    VIF) are dropped first with a warning (features in keep are kept if possible).
+
+    Parameters:
+    df          pd.DataFrame    Numeric features
+    threshold   float           Maximum acceptable VIF (default 5)
+    center      bool            Centered data (regressions with intercept) (default True)
+    keep        list            Features which are never dropped (default None)
+
+    Returns:
+    vif_data    pd.DataFrame    'Feature' and 'VIF' of remaining features
+    trace       pd.DataFrame    Elimination trace: 'Step', 'Feature', 'VIF',
+                                'Max VIF of Others', 'Remaining' for every dropped feature
+    """
+    keep = set(keep or [])
+    trace = []
+
+    # keep features first, so the collinear ones dropped are not in keep
+    order = [col for col in df.columns if col in keep] + [
+        col for col in df.columns if col not in keep
+    ]
+    collinear = _collinear_features(df[order], center)
+    if collinear:
+        kept_collinear = [col for col in collinear if col in keep]
+        if kept_collinear:
+            raise ValueError(
+                f"Features in keep are exactly collinear: {kept_collinear}"
+            )
+        warnings.warn(f"Dropping exactly collinear features first: {collinear}")
+        for feature in collinear:
+            trace.append(
+                {
+                    "Step": len(trace) + 1,
+                    "Feature": feature,
+                    "VIF": np.inf,
+                    "Max VIF of Others": np.nan,
+                    "Remaining": len(df.columns) - len(trace) - 1,
+                }
+            )
+        df = df.drop(columns=collinear)
+
+    features = list(df.columns)
+    gram_diag, inverse = _gram_inverse(df, center)
+
+    while len(features) > 1:
+        vif = gram_diag * np.diag(inverse)
+        candidates = np.array([feature not in keep for feature in features])
+        if not candidates.any():
+            break
+        k = int(np.argmax(np.where(candidates, vif, -np.inf)))
+        if vif[k] <= threshold:
+            break
+
+        others = np.arange(len(features)) != k
+        f = inverse[others, k]
+        inverse = inverse[np.ix_(others, others)] - np.outer(f, f) / inverse[k, k]
+
+        trace.append(
+            {
+                "Step": len(trace) + 1,
+                "Feature": features[k],
+                "VIF": vif[k],
+                "Max VIF of Others": vif[others].max(),
+                "Remaining": len(features) - 1,
+            }
+        )
+        features.pop(k)
+        gram_diag = gram_diag[others]
+
+    vif_data = pd.DataFrame({"Feature": features, "VIF": gram_diag * np.diag(inverse)})
+    trace = pd.DataFrame(
+        trace, columns=["Step", "Feature", "VIF", "Max VIF of Others", "Remaining"]
+    )
+    return vif_data, trace
@@ -0,0 +1,269 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import optimize, special, stats
+from statsmodels.miscmodels.ordinal_model import OrderedModel, OrderedResults
+
+
+def _ordered_logit_loglike(
+    params: np.ndarray, codes: np.ndarray, X: np.ndarray
+) -> Tuple[float, np.ndarray]:
+    """
+    Log-likelihood of ordered logit model and its analytic gradient, with the
+    parametrization of statsmodels OrderedModel: coefficients followed by
+    the first threshold and logarithms of increments of the next thresholds.
+    """
+    n_features = X.shape[1]
+    beta, threshold_params = params[:n_features], params[n_features:]
+    increments = np.r_[threshold_params[0], np.exp(threshold_params[1:])]
+    cuts = np.r_[-np.inf, np.cumsum(increments), np.inf]
+
+    xb = X @ beta
+    upper = cuts[codes + 1] - xb
+    lower = cuts[codes] - xb
+    cdf_upper, cdf_lower = special.expit(upper), special.expit(lower)
+    prob = np.maximum(cdf_upper - cdf_lower, 1e-300)
+    pdf_upper = cdf_upper * (1 - cdf_upper)
+    pdf_lower = cdf_lower * (1 - cdf_lower)
+
+    grad_beta = X.T @ ((pdf_lower - pdf_upper) / prob)
+    n_cuts = len(increments)
+    grad_cuts = (
+        np.bincount(codes, weights=pdf_upper / prob, minlength=n_cuts + 1)[:n_cuts]
+        - np.bincount(codes, weights=pdf_lower / prob, minlength=n_cuts + 1)[1:]
+    )
+    grad_increments = np.cumsum(grad_cuts[::-1])[::-1]
+    grad_increments[1:] *= increments[1:]
+
+    return np.log(prob).sum(), np.r_[grad_beta, grad_increments]
+
+
+def _negative_loglike(
+    params: np.ndarray, codes: np.ndarray, X: np.ndarray
+) -> Tuple[float, np.ndarray]:
+    loglike, grad = _ordered_logit_loglike(params, codes, X)
+    return -loglike, -grad
+
+
+def _fit_ordered(
+    codes: np.ndarray,
+    X: np.ndarray,
+    start_params: np.ndarray,
+    pvalues: bool = True,
+    maxiter: int = 1000,
+) -> Dict[str, Any]:
+    """
+    Fits ordered logit model by BFGS with analytic gradient and returns its
+    parameters, log-likelihood, AIC and (if pvalues) Wald p-values from
+    the Hessian computed by finite differences of the gradient.
+    """
+    result = optimize.minimize(
+        _negative_loglike,
+        start_params,
+        args=(codes, X),
+        jac=True,
+        method="BFGS",
+        options={"maxiter": maxiter, "gtol": 1e-6},
+    )
+    params = result.x
+    llf = -result.fun
+
+    p_values = None
+    if pvalues:
+        step = 1e-5
+        hessian = np.empty((len(params), len(params)))
+        for i in range(len(params)):
+            shift = np.zeros(len(params))
+            shift[i] = step
+            hessian[:, i] = (
+                _ordered_logit_loglike(params + shift, codes, X)[1]
+                - _ordered_logit_loglike(params - shift, codes, X)[1]
+            ) / (2 * step)
+        with np.errstate(invalid="ignore"):
+            std_err = np.sqrt(np.diag(np.linalg.pinv(-(hessian + hessian.T) / 2)))
+            p_values = 2 * stats.norm.sf(np.abs(params / std_err))
+
+    return {
+        "params": params,
+        "pvalues": p_values,
+        "llf": llf,
+        "aic": -2 * llf + 2 * len(params),
+        "converged": result.success,
+    }
+
+
+def _start_params(parent: Dict[str, Any], features: Tuple[str, ...]) -> np.ndarray:
+    """
+    Warm start from parent fit: coefficients of kept features, zeros for added
+    features and parent's thresholds.
+    """
+    coefficients = dict(zip(parent["features"], parent["params"]))
+    thresholds = parent["params"][len(parent["features"]) :]
+    return np.r_[[coefficients.get(feature, 0.0) for feature in features], thresholds]
+
+
+def stepwise_ordered_logit(
+    y: pd.Series,
+    X: pd.DataFrame,
+    criterion: str = "pvalue",
+    alpha: float = 0.05,
+    forward: bool = False,
+    alpha_enter: Optional[float] = None,
+    n_jobs: int = 1,
+    method: str = "bfgs",
+    cache: Optional[Dict[Tuple[str, ...], Dict[str, Any]]] = None,
+) -> Tuple[OrderedResults, pd.DataFrame]:
+    """
+    This function performs stepwise feature selection for
+    OrderedModel(distr="logit"): backward elimination by p-value or AIC with
+    optional forward steps (re-adding of previously dropped features).
+    Candidate models of a step are fitted in parallel with an analytic gradient
+    of the ordered logit log-likelihood (statsmodels differentiates numerically),
+    each fit is warm-started from the parent model's parameters and fits are
+    cached per feature subset. Only the selected model is fitted by statsmodels.
+
+    Parameters:
+    y           pd.Series       Ordinal target variable
+    X           pd.DataFrame    Features
+    criterion   str             'pvalue' - drop feature with the highest p-value above alpha;
+                                'aic' - drop feature whose removal lowers AIC the most
+    alpha       float           Significance level for removal (default 0.05)
+    forward     bool            Also try to add dropped features after every step (default False)
+    alpha_enter float           Significance level for adding (default alpha / 2)
+    n_jobs      int             Number of processes for candidate fits (default 1; -1 - all cores)
+    method      str             Optimizer of statsmodels fit of selected model (default "bfgs")
+    cache       dict            Fits cache {tuple of features: fit}, may be shared between calls
+                                with the same y and X (default None - new cache)
+
+    Returns:
+    result      OrderedResults  Fitted model of selected features
+    path        pd.DataFrame    Selection path: 'Step', 'Action', 'Feature', 'Criterion',
+                                'Features', 'Log-Likelihood', 'McFadden R2', 'AIC'
+    """
+    if criterion not in ("pvalue", "aic"):
+        raise ValueError(f"Unknown criterion '{criterion}', use 'pvalue' or 'aic'.")
+    alpha_enter = alpha / 2 if alpha_enter is None else alpha_enter
+    cache = {} if cache is None else cache
+    columns = list(X.columns)
+    X_array = X.to_numpy(dtype=float)
+
+    _, codes = np.unique(np.asarray(y), return_inverse=True)
+    counts = np.bincount(codes)
+    llnull = float((counts * np.log(counts / counts.sum())).sum())
+
+    cuts = special.logit(np.cumsum(counts)[:-1] / counts.sum())
+    null_fit = {"features": (), "params": np.r_[cuts[0], np.log(np.diff(cuts))]}
+
+    def subset(features):
+        return tuple(col for col in columns if col in features)
+
+    def fit_all(candidates, parent, pvalues=True):
+        missing = [
+            features
+            for features in candidates
+            if features not in cache or (pvalues and cache[features]["pvalues"] is None)
+        ]
+        tasks = [
+            (
+                codes,
+                X_array[:, [columns.index(col) for col in features]],
+                _start_params(parent, features),
+                pvalues,
+            )
+            for features in missing
+        ]
+        if n_jobs == 1 or len(tasks) <= 1:
+            fits = [_fit_ordered(*task) for task in tasks]
+        else:
+            n_workers = os.cpu_count() if n_jobs < 0 else n_jobs
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as pool:
+                fits = list(pool.map(_fit_ordered, *zip(*tasks)))
+        for features, fit in zip(missing, fits):
+            cache[features] = {**fit, "features": features}
+        return [cache[features] for features in candidates]
+
+    def pvalue(fit, feature):
+        return fit["pvalues"][fit["features"].index(feature)]
+
+    path = []
+
+    def record(action, feature, value, fit):
+        path.append(
+            {
+                "Step": len(path),
+                "Action": action,
+                "Feature": feature,
+                "Criterion": value,
+                "Features": len(fit["features"]),
+                "Log-Likelihood": fit["llf"],
+                "McFadden R2": 1 - fit["llf"] / llnull,
+                "AIC": fit["aic"],
+            }
+        )
+
+    current = subset(columns)
+    fit = fit_all([current], null_fit)[0]
+    record("start", None, None, fit)
+    visited = {current}
+
+    while True:
+        changed = False
+
+        if len(current) > 1:
+            if criterion == "pvalue":
+                values = [pvalue(fit, col) for col in current]
+                worst = int(np.nanargmax(values))
+                if values[worst] > alpha:
+                    feature = current[worst]
+                    new = subset(set(current) - {feature})
+                    fit = fit_all([new], fit)[0]
+                    current, changed = new, True
+                    record("drop", feature, values[worst], fit)
+            else:
+                candidates = [subset(set(current) - {col}) for col in current]
+                fits = fit_all(candidates, fit, pvalues=False)
+                best = int(np.argmin([candidate["aic"] for candidate in fits]))
+                if fits[best]["aic"] < fit["aic"]:
+                    feature = current[best]
+                    fit = fits[best]
+                    current, changed = candidates[best], True
+                    record("drop", feature, fit["aic"], fit)
+            visited.add(current)
+
+        excluded = [col for col in columns if col not in current]
+        candidates = [subset(set(current) | {col}) for col in excluded]
+        keep = [i for i, features in enumerate(candidates) if features not in visited]
+        if forward and keep:
+            fits = fit_all(
+                [candidates[i] for i in keep], fit, pvalues=criterion == "pvalue"
+            )
+            if criterion == "pvalue":
+                values = [
+                    pvalue(candidate, excluded[i]) for i, candidate in zip(keep, fits)
+                ]
+                best = int(np.argmin(values))
+                add = values[best] < alpha_enter
+            else:
+                values = [candidate["aic"] for candidate in fits]
+                best = int(np.argmin(values))
+                add = values[best] < fit["aic"]
+            if add:
+                fit = fits[best]
+                current, changed = candidates[keep[best]], True
+                visited.add(current)
+                record("add", excluded[keep[best]], values[best], fit)
+
+        if not changed:
+            break
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result = OrderedModel(y, X[list(current)], distr="logit").fit(
+            method=method, start_params=fit["params"], disp=False
+        )
+
+    return result, pd.DataFrame(path)
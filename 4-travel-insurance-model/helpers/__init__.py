@@ -0,0 +1,7 @@
+import os
+import sys
+
+# repository root, so that shared_helpers can be imported without installing it
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_DIR not in sys.path:
+    sys.path.append(_REPO_DIR)
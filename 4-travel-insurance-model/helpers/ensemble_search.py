@@ -0,0 +1,328 @@
+import hashlib
+import itertools
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from joblib import hash as joblib_hash
+from sklearn.base import clone
+from sklearn.ensemble import VotingClassifier
+from sklearn.model_selection import check_cv
+
+from shared_helpers.chunking import chunk_sizes, rows_per_chunk
+
+
+class OOFCache:
+    """
+    Persistent on-disk cache of out-of-fold predicted probabilities.
+
+    Every model is stored in its own .npy file named by a key, which is a hash
+    of the estimator (with its parameters), the CV splitter and the training
+    data, so a model is cross validated only once for any number of ensemble
+    searches over it.
+    """
+
+    def __init__(self, cache_dir: str = ".oof_cache"):
+        """
+        Params:
+        cache_dir         Directory for cache files (default ".oof_cache")
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def key(self, estimator: Any, cv_hash: str, data_hash: str) -> str:
+        """
+        Cache key of a model from its estimator and pre-computed hashes of
+        the CV splitter and data.
+        """
+        parts = "|".join([joblib_hash(clone(estimator)), cv_hash, data_hash])
+        return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Returns out-of-fold probabilities of a cached model or None.
+        """
+        try:
+            return np.load(self._path(key))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key: str, probabilities: np.ndarray) -> None:
+        """
+        Stores out-of-fold probabilities of a model (written atomically).
+        """
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "wb") as entry_file:
+            np.save(entry_file, probabilities)
+        os.replace(tmp_path, self._path(key))
+
+    def invalidate(self) -> int:
+        """
+        Removes all entries.
+
+        Returns:
+        Number of removed entries.
+        """
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npy"):
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+
+def _fit_predict_fold(
+    model_name: str,
+    model: Any,
+    X_vars: pd.DataFrame,
+    y_array: np.ndarray,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+) -> Tuple[str, np.ndarray, np.ndarray]:
+    """
+    Fits a model on a training fold and predicts probabilities of the
+    positive class for the test fold.
+    """
+    fitted = clone(model).fit(X_vars.iloc[train_idx], y_array[train_idx])
+    positive = list(fitted.classes_).index(1)
+    return (
+        model_name,
+        test_idx,
+        fitted.predict_proba(X_vars.iloc[test_idx])[:, positive],
+    )
+
+
+def oof_probabilities(
+    models_dict: Dict[str, Any],
+    model_names: List[str],
+    cv: Any,
+    X_vars: pd.DataFrame,
+    y_array: np.ndarray,
+    cache: Optional[OOFCache] = None,
+    n_jobs: int = -1,
+) -> pd.DataFrame:
+    """
+    Out-of-fold probabilities of the positive class of every model (same as
+    cross_val_predict(model, ..., method="predict_proba")[:, 1]). Models
+    found in the cache are loaded, the rest are fitted with model/fold fits
+    in parallel and stored.
+
+    Params:
+    models_dict       Dict with models (e.g. tuned_models_dict)
+    model_names       Names of models in models_dict to predict with
+    cv                Cross validation folds or splitter (should be deterministic,
+                      e.g. StratifiedKFold with random_state)
+    X_vars            Independent variables subset
+    y_array           Target variable array
+    cache             OOFCache for persistent probabilities (default None)
+    n_jobs            Number of parallel jobs (default -1 - all cores)
+
+    Returns:
+    DataFrame with one column of out-of-fold probabilities per model.
+    """
+    y_array = np.asarray(y_array).ravel()
+    splitter = check_cv(cv, y_array, classifier=True)
+    folds = list(splitter.split(X_vars, y_array))
+
+    probabilities: Dict[str, np.ndarray] = {}
+    keys: Dict[str, str] = {}
+    if cache is not None:
+        cv_hash = joblib_hash(folds)
+        data_hash = joblib_hash((X_vars, y_array))
+        for model_name in model_names:
+            keys[model_name] = cache.key(models_dict[model_name], cv_hash, data_hash)
+            cached = cache.get(keys[model_name])
+            if cached is not None:
+                probabilities[model_name] = cached
+
+    missing = [name for name in model_names if name not in probabilities]
+    print(
+        f"Models loaded from cache: {len(model_names) - len(missing)}, "
+        f"models to cross validate: {len(missing)}"
+    )
+
+    if missing:
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_predict_fold)(
+                model_name,
+                models_dict[model_name],
+                X_vars,
+                y_array,
+                train_idx,
+                test_idx,
+            )
+            for model_name in missing
+            for train_idx, test_idx in folds
+        )
+        for model_name in missing:
+            probabilities[model_name] = np.full(len(y_array), np.nan)
+        for model_name, test_idx, fold_proba in results:
+            probabilities[model_name][test_idx] = fold_proba
+        if cache is not None:
+            for model_name in missing:
+                cache.put(keys[model_name], probabilities[model_name])
+
+    return pd.DataFrame(
+        {name: probabilities[name] for name in model_names}, index=X_vars.index
+    )
+
+
+def weight_grid(n_models: int, levels: Sequence[int] = (0, 1, 2, 3)) -> np.ndarray:
+    """
+    Soft voting weight combinations: every combination of levels per model,
+    except all-zero ones and combinations proportional to a smaller one
+    (e.g. (2, 2, 2) duplicates (1, 1, 1)).
+
+    Returns:
+    2D array (combinations x models) of integer weights.
+    """
+    grid = np.array(list(itertools.product(levels, repeat=n_models)), dtype=np.int64)
+    grid = grid[grid.sum(axis=1) > 0]
+    divisor = np.gcd.reduce(grid, axis=1)
+    grid = np.unique(grid // divisor[:, None], axis=0)
+    return grid
+
+
+def ranking_scores(
+    y_array: np.ndarray, scores: np.ndarray, beta: float = 1.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    PR AUC (average precision) and the best decision threshold of every column
+    of a score matrix, computed for all columns at once.
+
+    Columns are sorted by descending score. Every positive contributes the
+    precision at the end of its run of tied scores, so PR AUC equals
+    sklearn average_precision_score. The threshold is the score at the run end
+    with the highest F-beta (predictions are 1 for scores >= threshold).
+
+    Params:
+    y_array           Binary target array (n rows)
+    scores            2D array of scores (n rows x columns)
+    beta              Beta of F-beta for threshold selection (default 1.0 - F1)
+
+    Returns:
+    pr_auc            PR AUC per column
+    thresholds        Threshold with the highest F-beta per column
+    f_scores          F-beta at the threshold per column
+    """
+    y_array = np.asarray(y_array).ravel().astype(np.float64)
+    n_rows = len(y_array)
+    n_positive = y_array.sum()
+
+    order = np.argsort(-scores, axis=0, kind="stable")
+    sorted_scores = np.take_along_axis(scores, order, axis=0)
+    sorted_y = y_array[order]
+
+    true_positives = np.cumsum(sorted_y, axis=0)
+    predicted = np.arange(1, n_rows + 1)[:, None]
+    precision = true_positives / predicted
+
+    # last row of every run of tied scores
+    run_end = np.ones_like(sorted_scores, dtype=bool)
+    run_end[:-1] = sorted_scores[:-1] != sorted_scores[1:]
+
+    # for every row, index of the end of its run
+    end_index = np.where(run_end, np.arange(n_rows)[:, None], n_rows - 1)
+    end_index = np.minimum.accumulate(end_index[::-1], axis=0)[::-1]
+    pr_auc = (sorted_y * np.take_along_axis(precision, end_index, axis=0)).sum(
+        axis=0
+    ) / n_positive
+
+    beta2 = beta**2
+    f_scores = np.where(
+        run_end,
+        (1 + beta2) * true_positives / (beta2 * n_positive + predicted),
+        -np.inf,
+    )
+    best = np.argmax(f_scores, axis=0)
+    columns = np.arange(scores.shape[1])
+    return pr_auc, sorted_scores[best, columns], f_scores[best, columns]
+
+
+def search_voting_ensemble(
+    models_dict: Dict[str, Any],
+    model_names: List[str],
+    cv: Any,
+    X_vars: pd.DataFrame,
+    y_array: np.ndarray,
+    levels: Sequence[int] = (0, 1, 2, 3),
+    beta: float = 1.0,
+    cache: Optional[OOFCache] = None,
+    n_jobs: int = -1,
+    max_chunk_mb: float = 64.0,
+    refit: bool = True,
+) -> Tuple[Optional[VotingClassifier], pd.Series, pd.DataFrame]:
+    """
+    Searches soft voting weights and the decision threshold of a
+    VotingClassifier without refitting base models per configuration.
+
+    Out-of-fold probabilities of every model are computed once (or loaded
+    from the cache). Soft voting probabilities of all weight combinations are
+    one matrix product of these probabilities and the normalized weight grid
+    (same as out-of-fold predict_proba of VotingClassifier with the weights),
+    scored with PR AUC in memory-bounded chunks of combinations. The best
+    threshold of every combination maximizes F-beta. Only the winning
+    configuration is fitted, without models with zero weight.
+
+    Params:
+    models_dict       Dict with models (e.g. tuned_models_dict)
+    model_names       Names of models in models_dict for the ensemble
+    cv                Cross validation folds or splitter (should be deterministic)
+    X_vars            Independent variables subset
+    y_array           Target variable array
+    levels            Weight levels of every model (default (0, 1, 2, 3))
+    beta              Beta of F-beta for threshold selection (default 1.0 - F1)
+    cache             OOFCache for persistent probabilities (default None)
+    n_jobs            Number of parallel jobs (default -1 - all cores)
+    max_chunk_mb      Memory limit for one chunk of combinations in MB (default 64)
+    refit             Fit the winning VotingClassifier on all data (default True)
+
+    Returns:
+    ensemble          Fitted VotingClassifier (soft voting) with the best weights
+                      (None if refit is False)
+    best              Row of results of the best combination
+    results_df        Weights (one column per model), "PR AUC (OOF)",
+                      "Threshold" and "F-beta (OOF)" of every combination,
+                      sorted by PR AUC
+    """
+    y_array = np.asarray(y_array).ravel()
+    probabilities = oof_probabilities(
+        models_dict, model_names, cv, X_vars, y_array, cache, n_jobs
+    ).to_numpy()
+
+    weights = weight_grid(len(model_names), levels)
+    normalized = weights / weights.sum(axis=1, keepdims=True)
+
+    # sort, cumsum and run indices take about 6 arrays of 8 bytes per cell
+    chunk_size = rows_per_chunk(max_chunk_mb, len(y_array) * 48)
+    chunks = []
+    start = 0
+    for size in chunk_sizes(len(weights), chunk_size):
+        blended = probabilities @ normalized[start : start + size].T
+        chunks.append(np.column_stack(ranking_scores(y_array, blended, beta)))
+        start += size
+    scores = np.vstack(chunks)
+
+    results_df = pd.DataFrame(weights, columns=model_names)
+    results_df[["PR AUC (OOF)", "Threshold", "F-beta (OOF)"]] = scores
+    results_df = results_df.sort_values(
+        ["PR AUC (OOF)", "F-beta (OOF)"], ascending=False, kind="stable"
+    ).reset_index(drop=True)
+    best = results_df.iloc[0]
+
+    ensemble = None
+    if refit:
+        selected = [name for name in model_names if best[name] > 0]
+        ensemble = VotingClassifier(
+            estimators=[(name, models_dict[name]) for name in selected],
+            voting="soft",
+            weights=[int(best[name]) for name in selected],
+            n_jobs=n_jobs,
+        ).fit(X_vars, y_array)
+
+    return ensemble, best, results_df
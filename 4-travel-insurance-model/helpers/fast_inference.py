@@ -0,0 +1,248 @@
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+
+class CompiledPipeline:
+    """
+    Single-record predictor compiled from a fitted pipeline of the notebook
+    (ColumnTransformer 'preprocessor' with MinMaxScaler, OneHotEncoder and
+    passthrough columns, followed by LogisticRegression, DecisionTreeClassifier
+    or RandomForestClassifier).
+
+    The preprocessor is compiled into lookup tables: (scale, offset) per
+    scaled or passthrough column and {category: output position} per one-hot
+    encoded column. For logistic regression the coefficients are folded into
+    the tables, so a probability is the logistic function of the intercept plus
+    one slope or table lookup per column. Trees are padded into 2D arrays and
+    all trees of a forest are traversed at once.
+    """
+
+    def __init__(self, pipeline: Any):
+        """
+        Params:
+        pipeline          Fitted Pipeline (preprocessor, classifier)
+        """
+        preprocessor = pipeline.steps[0][1]
+        self.classifier = pipeline.steps[-1][1]
+        self.n_outputs = len(preprocessor.get_feature_names_out())
+
+        # column -> (output position, scale, offset)
+        self.numeric: Dict[str, tuple] = {}
+        # column -> ({category: output position or None}, ignore unknown)
+        self.categorical: Dict[str, tuple] = {}
+        position = 0
+        for _, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            columns = [
+                preprocessor.feature_names_in_[col] if isinstance(col, int) else col
+                for col in columns
+            ]
+            if transformer == "passthrough" or (
+                isinstance(transformer, FunctionTransformer)
+                and transformer.func is None
+            ):
+                for col in columns:
+                    self.numeric[col] = (position, 1.0, 0.0)
+                    position += 1
+            elif isinstance(transformer, MinMaxScaler):
+                for col, scale, offset in zip(
+                    columns, transformer.scale_, transformer.min_
+                ):
+                    self.numeric[col] = (position, float(scale), float(offset))
+                    position += 1
+            elif isinstance(transformer, OneHotEncoder):
+                drop_idx = transformer.drop_idx_
+                for i, (col, categories) in enumerate(
+                    zip(columns, transformer.categories_)
+                ):
+                    table = {}
+                    for j, category in enumerate(categories.tolist()):
+                        if drop_idx is not None and drop_idx[i] == j:
+                            table[category] = None
+                        else:
+                            table[category] = position
+                            position += 1
+                    ignore = transformer.handle_unknown != "error"
+                    self.categorical[col] = (table, ignore)
+            else:
+                raise TypeError(
+                    f"Transformer {type(transformer).__name__} is not supported."
+                )
+        if position != self.n_outputs:
+            raise ValueError("Compiled features do not match the preprocessor output.")
+
+        if isinstance(self.classifier, LogisticRegression):
+            self._compile_linear()
+        elif isinstance(
+            self.classifier, (DecisionTreeClassifier, RandomForestClassifier)
+        ):
+            self._compile_trees()
+        else:
+            raise TypeError(
+                f"Classifier {type(self.classifier).__name__} is not supported, "
+                "use LogisticRegression, DecisionTreeClassifier or RandomForestClassifier."
+            )
+
+    def _compile_linear(self) -> None:
+        weights = self.classifier.coef_[0]
+        self.intercept = float(self.classifier.intercept_[0])
+        self.slopes = {}
+        for col, (position, scale, offset) in self.numeric.items():
+            self.slopes[col] = float(weights[position] * scale)
+            self.intercept += float(weights[position] * offset)
+        self.contributions = {
+            col: (
+                {
+                    category: 0.0 if position is None else float(weights[position])
+                    for category, position in table.items()
+                },
+                ignore,
+            )
+            for col, (table, ignore) in self.categorical.items()
+        }
+        self.predict_proba = self._predict_linear
+
+    def _compile_trees(self) -> None:
+        trees = [
+            estimator.tree_
+            for estimator in getattr(self.classifier, "estimators_", [self.classifier])
+        ]
+        n_nodes = max(tree.node_count for tree in trees)
+        shape = (len(trees), n_nodes)
+        self.feature = np.zeros(shape, dtype=np.intp)
+        self.threshold = np.zeros(shape)
+        self.left = np.full(shape, -1, dtype=np.intp)
+        self.right = np.full(shape, -1, dtype=np.intp)
+        self.leaf_proba = np.zeros(shape)
+        positive = list(self.classifier.classes_).index(1)
+        for t, tree in enumerate(trees):
+            n = tree.node_count
+            self.feature[t, :n] = np.maximum(tree.feature, 0)
+            self.threshold[t, :n] = tree.threshold
+            self.left[t, :n] = tree.children_left
+            self.right[t, :n] = tree.children_right
+            values = tree.value[:, 0, :]
+            self.leaf_proba[t, :n] = values[:, positive] / values.sum(axis=1)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.tree_index = np.arange(len(trees))
+        self.predict_proba = self._predict_trees
+
+    def _lookup(self, table: dict, ignore: bool, col: str, value: Any) -> Any:
+        try:
+            return table[value]
+        except KeyError:
+            if ignore:
+                return None
+            raise ValueError(f"Unknown value {value!r} of '{col}'.") from None
+
+    def _predict_linear(self, record: Dict[str, Any]) -> float:
+        logit = self.intercept
+        for col, slope in self.slopes.items():
+            logit += slope * record[col]
+        for col, (table, ignore) in self.contributions.items():
+            contribution = self._lookup(table, ignore, col, record[col])
+            if contribution is not None:
+                logit += contribution
+        return float(expit(logit))
+
+    def transform(self, record: Dict[str, Any]) -> np.ndarray:
+        """
+        Preprocessor output of one record (same as preprocessor.transform).
+        """
+        x = np.zeros(self.n_outputs)
+        for col, (position, scale, offset) in self.numeric.items():
+            x[position] = record[col] * scale + offset
+        for col, (table, ignore) in self.categorical.items():
+            position = self._lookup(table, ignore, col, record[col])
+            if position is not None:
+                x[position] = 1.0
+        return x
+
+    def _predict_trees(self, record: Dict[str, Any]) -> float:
+        # trees compare float32 features with float64 thresholds
+        x = self.transform(record).astype(np.float32).astype(np.float64)
+        node = np.zeros(len(self.tree_index), dtype=np.intp)
+        for _ in range(self.max_depth):
+            left = self.left[self.tree_index, node]
+            go_left = (
+                x[self.feature[self.tree_index, node]]
+                <= self.threshold[self.tree_index, node]
+            )
+            node = np.where(
+                left == -1,
+                node,
+                np.where(go_left, left, self.right[self.tree_index, node]),
+            )
+        return float(self.leaf_proba[self.tree_index, node].mean())
+
+
+def compile_pipeline(pipeline: Any) -> CompiledPipeline:
+    """
+    Compiles a fitted pipeline into a dict-in / probability-out predictor:
+    compile_pipeline(pipe).predict_proba({"Age": 31, ...}) equals
+    pipe.predict_proba(pd.DataFrame([record]))[0, 1].
+    """
+    return CompiledPipeline(pipeline)
+
+
+def latency_benchmark(
+    pipeline: Any,
+    records: List[Dict[str, Any]],
+    compiled: Optional[CompiledPipeline] = None,
+) -> pd.DataFrame:
+    """
+    Micro-benchmark of single-record latency: sklearn pipeline on one-row
+    DataFrames vs compiled predictor on dicts.
+
+    Params:
+    pipeline          Fitted Pipeline
+    records           Records (dicts) to score one at a time
+    compiled          Compiled predictor (default None - compiled from pipeline)
+
+    Returns:
+    DataFrame with p50, p99 and mean latency in microseconds and the maximum
+    absolute difference of probabilities.
+    """
+    compiled = compiled or compile_pipeline(pipeline)
+    predictors = {
+        "sklearn Pipeline": lambda record: pipeline.predict_proba(
+            pd.DataFrame([record])
+        )[0, 1],
+        "Compiled": compiled.predict_proba,
+    }
+
+    rows = []
+    probabilities = {}
+    for name, predict in predictors.items():
+        predict(records[0])
+        latencies = np.empty(len(records))
+        values = np.empty(len(records))
+        for i, record in enumerate(records):
+            start = time.perf_counter()
+            values[i] = predict(record)
+            latencies[i] = time.perf_counter() - start
+        probabilities[name] = values
+        latencies *= 1e6
+        rows.append(
+            {
+                "Predictor": name,
+                "p50 (us)": np.percentile(latencies, 50),
+                "p99 (us)": np.percentile(latencies, 99),
+                "Mean (us)": latencies.mean(),
+            }
+        )
+
+    results = pd.DataFrame(rows)
+    results["Max Abs Diff"] = np.abs(
+        probabilities["Compiled"] - probabilities["sklearn Pipeline"]
+    ).max()
+    return results
@@ -0,0 +1,138 @@
+import hashlib
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from phik import definitions as phik_defs
+from phik.binning import auto_bin_data
+from phik.phik import phik_from_hist2d
+
+
+def _phik_from_table(table: np.ndarray, noise_correction: bool = True) -> float:
+    """
+    Phik value of one contingency table (NaN when a variable has less than
+    two observed values, like in phik).
+    """
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    if min(table.shape) < 2:
+        return np.nan
+    return float(phik_from_hist2d(table, noise_correction=noise_correction))
+
+
+def _phik_from_tables(
+    tables: List[np.ndarray], noise_correction: bool = True
+) -> List[float]:
+    return [_phik_from_table(table, noise_correction) for table in tables]
+
+
+class PhikMatrixBuilder:
+    """
+    Pairwise Phik correlation matrix with the same binning and values as
+    DataFrame.phik_matrix (dropna, underflow and overflow bins dropped).
+
+    Every column is binned once and encoded as integer codes, contingency
+    tables of all pairs are counted with np.bincount and Phik values of the
+    pairs are computed in a process pool. Values are cached per pair of binned
+    columns, so adding a column only computes pairs of the new column.
+    """
+
+    def __init__(self, n_jobs: int = 1):
+        """
+        Params:
+        n_jobs            Number of worker processes for Phik values
+                          (default 1 - no pool; -1 - all cores)
+        """
+        self.n_jobs = n_jobs
+        self._cache: Dict[Tuple[str, str, bool], float] = {}
+
+    @staticmethod
+    def _encode(data_binned: pd.DataFrame) -> Dict[str, Tuple[np.ndarray, int, str]]:
+        """
+        Integer codes (-1 for dropped values), number of codes and fingerprint
+        of every binned column.
+        """
+        encoded = {}
+        for col in data_binned.columns:
+            values = data_binned[col].replace([phik_defs.UF, phik_defs.OF], np.nan)
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            codes = codes.astype(np.int64)
+            digest = hashlib.sha1(codes.tobytes()).hexdigest()
+            encoded[col] = (codes, len(uniques), f"{len(codes)}:{digest}")
+        return encoded
+
+    @staticmethod
+    def _table(
+        codes_x: np.ndarray, n_x: int, codes_y: np.ndarray, n_y: int
+    ) -> np.ndarray:
+        valid = (codes_x >= 0) & (codes_y >= 0)
+        flat = codes_x[valid] * n_y + codes_y[valid]
+        return np.bincount(flat, minlength=n_x * n_y).reshape(n_x, n_y)
+
+    def matrix(
+        self,
+        df: pd.DataFrame,
+        interval_cols: Optional[List[str]] = None,
+        bins: Union[int, list, np.ndarray, dict] = 10,
+        quantile: bool = False,
+        noise_correction: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Returns Phik correlation matrix of df.
+
+        Params:
+        df                DataFrame with variables
+        interval_cols     Names of interval (numeric) columns to be binned
+                          (default None - guessed by phik)
+        bins              Number of bins or bin edges as in phik (default 10)
+        quantile          Quantile (True) or uniform (False) bins (default False)
+        noise_correction  Apply noise correction of phik (default True)
+        """
+        data_binned, _ = auto_bin_data(
+            df, interval_cols=interval_cols, bins=bins, quantile=quantile, verbose=False
+        )
+        encoded = self._encode(data_binned)
+        columns = list(data_binned.columns)
+
+        pairs = []
+        tables = []
+        for col_x, col_y in itertools.combinations(columns, 2):
+            key = (encoded[col_x][2], encoded[col_y][2], noise_correction)
+            if key in self._cache:
+                continue
+            codes_x, n_x, _ = encoded[col_x]
+            codes_y, n_y, _ = encoded[col_y]
+            pairs.append(key)
+            tables.append(self._table(codes_x, n_x, codes_y, n_y))
+
+        if tables:
+            if self.n_jobs == 1 or len(tables) == 1:
+                values = _phik_from_tables(tables, noise_correction)
+            else:
+                n_workers = os.cpu_count() if self.n_jobs < 0 else self.n_jobs
+                chunk = -(-len(tables) // n_workers)
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    results = executor.map(
+                        _phik_from_tables,
+                        [tables[i : i + chunk] for i in range(0, len(tables), chunk)],
+                        itertools.repeat(noise_correction),
+                    )
+                    values = [value for result in results for value in result]
+            self._cache.update(zip(pairs, values))
+
+        phik = pd.DataFrame(
+            np.eye(len(columns)), index=columns, columns=columns, dtype=float
+        )
+        for (i, col_x), (j, col_y) in itertools.combinations(enumerate(columns), 2):
+            key = (encoded[col_x][2], encoded[col_y][2], noise_correction)
+            phik.iat[i, j] = phik.iat[j, i] = self._cache[key]
+
+        return phik
+
+    def clear(self) -> None:
+        """
+        Removes all cached pair values.
+        """
+        self._cache = {}
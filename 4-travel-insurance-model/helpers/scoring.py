@@ -0,0 +1,285 @@
+"""
+Persistence of tuned travel insurance models and chunked batch scoring of
+new customers.
+
+Usage (from the project folder):
+    python -m helpers.scoring models/voting_ensemble.joblib customers.csv scores.csv
+    python -m helpers.scoring model.joblib customers.csv scores.csv --jobs 4 --id-col "Unnamed: 0"
+"""
+
+import argparse
+import os
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+import pandas as pd
+import sklearn
+
+# Encodings used in EDA (df_train) mapped back to the encodings of training data
+COLUMN_ALIASES = {"Government Sector": "Employment Type"}
+VALUE_ALIASES = {
+    "Employment Type": {
+        "Yes": "Government Sector",
+        "No": "Private Sector/Self Employed",
+    },
+    "ChronicDiseases": {"Yes": 1, "No": 0},
+}
+MAX_CATEGORIES = 20
+OUT_OF_RANGE_ACTIONS = ("warn", "error", "ignore")
+
+_worker_model: Any = None
+_worker_schema: Optional[Dict[str, Any]] = None
+
+
+def build_schema(X_train: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Schema of training data: column order, dtypes, allowed values of
+    categorical columns (object columns or columns with few values)
+    and ranges of numeric columns.
+    """
+    schema = {"columns": list(X_train.columns), "dtypes": {}, "categories": {}}
+    schema["ranges"] = {}
+    for col in X_train.columns:
+        schema["dtypes"][col] = str(X_train[col].dtype)
+        if X_train[col].dtype == object or X_train[col].nunique() <= MAX_CATEGORIES:
+            schema["categories"][col] = sorted(X_train[col].unique().tolist())
+        if pd.api.types.is_numeric_dtype(X_train[col]):
+            schema["ranges"][col] = [
+                X_train[col].min().item(),
+                X_train[col].max().item(),
+            ]
+    return schema
+
+
+def save_model(
+    model: Any,
+    X_train: pd.DataFrame,
+    path: str,
+    name: str = "",
+    metrics: Optional[Dict[str, float]] = None,
+) -> str:
+    """
+    Saves a fitted model (pipeline with preprocessor and classifier or
+    VotingClassifier of pipelines) together with schema of its training data.
+
+    Params:
+    model             Fitted model accepting raw features (e.g. tuned_models_dict["Random Forest"])
+    X_train           Training features (used for the schema)
+    path              Path of the .joblib file
+    name              Reference name of the model (default "")
+    metrics           Evaluation metrics to store, e.g. {"PR AUC": 0.77} (default None)
+
+    Returns:
+    Path of the saved file.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    joblib.dump(
+        {
+            "model": model,
+            "name": name,
+            "schema": build_schema(X_train),
+            "metrics": metrics or {},
+            "sklearn_version": sklearn.__version__,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        path,
+    )
+    return path
+
+
+def load_model(path: str) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Loads a model saved with save_model.
+
+    Returns:
+    model             Fitted model
+    schema            Schema of training data
+    """
+    saved = joblib.load(path)
+    return saved["model"], saved["schema"]
+
+
+def prepare_features(
+    chunk: pd.DataFrame, schema: Dict[str, Any], out_of_range: str = "warn"
+) -> pd.DataFrame:
+    """
+    Converts input data to the training encoding: renames EDA columns
+    ('Government Sector'), maps Yes/No encodings of 'Employment Type' and
+    'ChronicDiseases' back, orders columns and casts dtypes. Raises ValueError
+    for missing columns or values of categorical columns not seen in training
+    (one-hot encoders of the pipelines do not accept them).
+
+    Values of other numeric columns outside their training range (the model
+    extrapolates) are reported depending on out_of_range: "warn" (default,
+    UserWarning), "error" (ValueError) or "ignore".
+    """
+    if out_of_range not in OUT_OF_RANGE_ACTIONS:
+        raise ValueError(
+            f"Unknown out_of_range '{out_of_range}', use one of {OUT_OF_RANGE_ACTIONS}."
+        )
+    chunk = chunk.rename(columns=COLUMN_ALIASES)
+    missing = [col for col in schema["columns"] if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+
+    features = chunk[schema["columns"]].copy()
+    for col, mapping in VALUE_ALIASES.items():
+        if col in features.columns and features[col].isin(list(mapping)).any():
+            features[col] = features[col].replace(mapping)
+
+    for col in schema["columns"]:
+        dtype = schema["dtypes"][col]
+        if dtype != "object":
+            features[col] = features[col].astype(dtype)
+        if col in schema["categories"]:
+            unknown = set(features[col].unique().tolist()) - set(
+                schema["categories"][col]
+            )
+            if unknown:
+                raise ValueError(f"Unknown values in '{col}': {sorted(unknown)}")
+
+    if out_of_range != "ignore":
+        for col, (low, high) in schema.get("ranges", {}).items():
+            if col in schema["categories"]:
+                continue
+            n_outside = int(((features[col] < low) | (features[col] > high)).sum())
+            if n_outside:
+                message = (
+                    f"{n_outside} values of '{col}' are outside the training "
+                    f"range [{low}, {high}]"
+                )
+                if out_of_range == "error":
+                    raise ValueError(message)
+                warnings.warn(message)
+
+    return features
+
+
+def _init_worker(model_path: str) -> None:
+    global _worker_model, _worker_schema
+    _worker_model, _worker_schema = load_model(model_path)
+
+
+def _score_chunk(
+    chunk: pd.DataFrame, id_col: Optional[str] = None, out_of_range: str = "warn"
+) -> pd.DataFrame:
+    """
+    Probabilities of the positive class for a chunk (model of the process).
+    """
+    features = prepare_features(chunk, _worker_schema, out_of_range)
+    scores = pd.DataFrame(
+        {"TravelInsuranceProba": _worker_model.predict_proba(features)[:, 1]},
+        index=chunk.index,
+    )
+    if id_col is not None:
+        scores.insert(0, id_col, chunk[id_col].to_numpy())
+    return scores
+
+
+def score_csv(
+    model_path: str,
+    input_csv: str,
+    output_csv: str,
+    chunksize: int = 100_000,
+    n_jobs: int = 1,
+    id_col: Optional[str] = None,
+    out_of_range: str = "warn",
+) -> int:
+    """
+    Streams input CSV in chunks, scores chunks (in a process pool if n_jobs > 1)
+    and appends probabilities to output CSV in input order. At most 2 * n_jobs
+    chunks are in memory at a time.
+
+    Params:
+    model_path        Path of a model saved with save_model
+    input_csv         CSV with customers' features
+    output_csv        CSV for probabilities
+    chunksize         Rows per chunk (default 100000)
+    n_jobs            Number of worker processes (default 1; -1 - all cores;
+                      0 and values below -1 raise ValueError)
+    id_col            Column copied from input to output (default None - row number)
+    out_of_range      Numeric values outside training ranges: "warn" (default),
+                      "error" or "ignore" (see prepare_features)
+
+    Returns:
+    Number of scored rows.
+    """
+    if n_jobs != -1 and n_jobs < 1:
+        raise ValueError(f"n_jobs must be -1 (all cores) or at least 1, got {n_jobs}.")
+    reader = pd.read_csv(input_csv, chunksize=chunksize)
+    n_rows = 0
+    header = True
+
+    def write(scores: pd.DataFrame) -> None:
+        nonlocal n_rows, header
+        scores.to_csv(
+            output_csv,
+            mode="w" if header else "a",
+            header=header,
+            index=id_col is None,
+            index_label="row",
+        )
+        n_rows += len(scores)
+        header = False
+
+    if n_jobs == 1:
+        _init_worker(model_path)
+        for chunk in reader:
+            write(_score_chunk(chunk, id_col, out_of_range))
+        return n_rows
+
+    n_workers = os.cpu_count() if n_jobs == -1 else n_jobs
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(model_path,)
+    ) as executor:
+        pending = deque()
+        for chunk in reader:
+            pending.append(executor.submit(_score_chunk, chunk, id_col, out_of_range))
+            if len(pending) >= 2 * n_workers:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+
+    return n_rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Batch scoring of travel insurance model."
+    )
+    parser.add_argument("model", help="model file saved with save_model (.joblib)")
+    parser.add_argument("input", help="input CSV with customers' features")
+    parser.add_argument("output", help="output CSV for probabilities")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="rows per chunk")
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="worker processes (-1 - all cores)"
+    )
+    parser.add_argument("--id-col", default=None, help="column copied to output")
+    parser.add_argument(
+        "--out-of-range",
+        choices=OUT_OF_RANGE_ACTIONS,
+        default="warn",
+        help="numeric values outside training ranges",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    n_rows = score_csv(
+        args.model,
+        args.input,
+        args.output,
+        args.chunksize,
+        args.jobs,
+        args.id_col,
+        args.out_of_range,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Scored {n_rows} rows in {elapsed:.1f} s ({n_rows / elapsed:,.0f} rows/s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+TuningCache and cached_search moved to shared_helpers.tuning; this module
+keeps imports from helpers.tuning_cache working.
+"""
+
+from shared_helpers.tuning import TuningCache, cached_search  # noqa: F401
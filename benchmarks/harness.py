@@ -0,0 +1,175 @@
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+PROJECTS = {
+    "wine": "3-wine-quality-model",
+    "travel": "4-travel-insurance-model",
+    "cookie_cats": os.path.join("2-AB-testing", "Cookie_Cats"),
+}
+
+DATASETS = {
+    "wine": os.path.join(PROJECTS["wine"], "data", "winequality-red.csv"),
+    "travel": os.path.join(PROJECTS["travel"], "data", "TravelInsurancePrediction.csv"),
+    "cookie_cats": os.path.join(PROJECTS["cookie_cats"], "datasets", "cookie_cats.csv"),
+}
+
+
+def load_helpers(project: str) -> Any:
+    """
+    Imports the 'helpers' package of a project under the alias
+    '<project>_helpers', so helpers of all projects can be loaded in one process.
+    """
+    alias = f"{project}_helpers"
+    if alias in sys.modules:
+        return sys.modules[alias]
+
+    package_dir = os.path.join(REPO_DIR, PROJECTS[project], "helpers")
+    spec = importlib.util.spec_from_file_location(
+        alias,
+        os.path.join(package_dir, "__init__.py"),
+        submodule_search_locations=[package_dir],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[alias] = package
+    spec.loader.exec_module(package)
+
+    return package
+
+
+def synthetic_frame(project: str, n_rows: int, seed: int = 2024) -> pd.DataFrame:
+    """
+    Synthetic DataFrame shaped like a project's dataset: rows are resampled
+    with replacement from the real dataset (keeping dtypes, categories and
+    correlations) and float columns get a small relative jitter, so the number
+    of distinct values grows with the number of rows.
+    """
+    real = pd.read_csv(os.path.join(REPO_DIR, DATASETS[project]))
+    if project == "travel":
+        real = real.drop(columns=["Unnamed: 0"])
+
+    rng = np.random.default_rng(seed)
+    frame = real.iloc[rng.integers(0, len(real), size=n_rows)].reset_index(drop=True)
+
+    for col in frame.select_dtypes("float").columns:
+        frame[col] = frame[col] * (1 + rng.normal(0, 0.01, size=n_rows))
+    if project == "travel":
+        noise = rng.integers(-5, 6, size=n_rows) * 10000
+        frame["AnnualIncome"] = (frame["AnnualIncome"] + noise).clip(lower=0)
+    if project == "cookie_cats":
+        frame["userid"] = np.arange(n_rows)
+
+    return frame
+
+
+def measure(func: Callable[[], Any], repeat: int = 3) -> Dict[str, float]:
+    """
+    Times a function (best and mean wall time of repeated calls) and measures
+    its peak traced memory in a separate call, as tracemalloc slows execution.
+    Output printed by the function is discarded.
+    """
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "min_s": min(timings),
+        "mean_s": float(np.mean(timings)),
+        "peak_mb": peak / 1024**2,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(records: List[Dict[str, Any]], label: str = "") -> str:
+    """
+    Saves benchmark records with run metadata to benchmarks/results/.
+
+    Returns:
+    Path of the saved file.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    file_name = f"{timestamp}{'-' + label if label else ''}.json"
+    path = os.path.join(RESULTS_DIR, file_name)
+
+    run = {
+        "timestamp": timestamp,
+        "label": label,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "records": records,
+    }
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump(run, results_file, indent=1)
+
+    return path
+
+
+def load_results(path: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Loads records of a saved run (the latest run if path is None).
+    """
+    if path is None:
+        if not os.path.isdir(RESULTS_DIR):
+            return None
+        runs = sorted(f for f in os.listdir(RESULTS_DIR) if f.endswith(".json"))
+        if not runs:
+            return None
+        path = os.path.join(RESULTS_DIR, runs[-1])
+
+    with open(path, encoding="utf-8") as results_file:
+        return pd.DataFrame(json.load(results_file)["records"])
+
+
+def compare_results(current: pd.DataFrame, previous: pd.DataFrame) -> pd.DataFrame:
+    """
+    Joins two runs on case and rows and computes time and memory ratios
+    (current / previous; above 1 means slower or more memory).
+    """
+    keys = ["project", "case", "rows"]
+    merged = current.merge(previous, on=keys, how="left", suffixes=("", "_prev"))
+    merged["time_ratio"] = merged["min_s"] / merged["min_s_prev"]
+    merged["memory_ratio"] = merged["peak_mb"] / merged["peak_mb_prev"]
+    return merged[
+        keys + ["min_s", "min_s_prev", "time_ratio", "peak_mb", "memory_ratio"]
+    ]
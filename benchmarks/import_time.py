@@ -0,0 +1,104 @@
+"""
+Import time and resident memory of the helper modules, each measured in a
+fresh interpreter (median of repeated runs).
+
+Usage (from the repository root):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeats 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAVEL_DIR = os.path.join(REPO_DIR, "4-travel-insurance-model")
+
+# imports of helpers.m3s1_helpers before shared helpers were imported lazily
+EAGER_IMPORTS = """
+import numpy, pandas
+import plotly.express, plotly.graph_objects, plotly.io, plotly.subplots
+from IPython.display import Image, Markdown, display
+from joblib import Parallel, delayed
+from scipy import stats
+from sklearn.experimental import enable_halving_search_cv
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV
+from statsmodels.stats.multitest import multipletests
+from statsmodels.stats.proportion import proportion_confint
+"""
+
+CASES = {
+    "pandas (floor)": "import numpy, pandas",
+    "eager imports (former m3s1_helpers)": EAGER_IMPORTS,
+    "helpers.m3s1_helpers": "import helpers.m3s1_helpers",
+    "shared_helpers.outliers + outliers_all_columns": """
+import numpy as np, pandas as pd
+from shared_helpers.outliers import outliers_all_columns
+outliers_all_columns(pd.DataFrame(np.random.default_rng(0).normal(size=(1000, 5))))
+""",
+    "shared_helpers.stats + ztest_proportions_of_1": """
+import pandas as pd
+from shared_helpers.display import set_backend
+from shared_helpers.stats import ztest_proportions_of_1
+set_backend("json")
+df = pd.DataFrame({"Feature": ["Yes", "No"] * 50, "Target": [0, 1, 1, 0] * 25})
+ztest_proportions_of_1(df, "Feature", "Target")
+""",
+    "shared_helpers.plotting": "import shared_helpers.plotting",
+}
+
+CHILD = """
+import io, json, resource, sys, time
+from contextlib import redirect_stdout
+start = time.perf_counter()
+with redirect_stdout(io.StringIO()):
+    exec(sys.argv[1])
+wall = time.perf_counter() - start
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({"wall_s": wall, "rss_mb": rss_mb}))
+"""
+
+
+def measure_case(code: str, repeats: int) -> Dict[str, float]:
+    """
+    Median wall time and max RSS of running code in fresh interpreters.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([REPO_DIR, TRAVEL_DIR]))
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+            cwd=TRAVEL_DIR,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "wall_s": statistics.median(run["wall_s"] for run in runs),
+        "rss_mb": statistics.median(run["rss_mb"] for run in runs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--repeats", type=int, default=5, help="fresh interpreters per case"
+    )
+    args = parser.parse_args()
+
+    print(f"{'Case':<48} {'Time (s)':>9} {'RSS (MB)':>9}")
+    for name, code in CASES.items():
+        result = measure_case(code, args.repeats)
+        print(f"{name:<48} {result['wall_s']:>9.3f} {result['rss_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Single-record latency of the travel insurance pipelines: sklearn Pipeline on
+one-row DataFrames vs predictor compiled by helpers.fast_inference.
+
+Usage (from the repository root):
+    python benchmarks/inference_latency.py
+    python benchmarks/inference_latency.py --records 2000
+"""
+
+import argparse
+import importlib
+import warnings
+
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+from harness import load_helpers, synthetic_frame
+
+CLASSIFIERS = {
+    "Logistic Regression": LogisticRegression(),
+    "Decision Tree": DecisionTreeClassifier(max_depth=10, random_state=2024),
+    "Random Forest": RandomForestClassifier(random_state=2024),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--records", type=int, default=1000, help="records scored one at a time"
+    )
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    load_helpers("travel")
+    fast_inference = importlib.import_module("travel_helpers.fast_inference")
+
+    df = synthetic_frame("travel", 5000)
+    X_vars = df.drop(columns=["TravelInsurance"])
+    y_array = df["TravelInsurance"].to_numpy()
+    records = X_vars.head(args.records).to_dict("records")
+
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("minmax_scaler", MinMaxScaler(), ["AnnualIncome"]),
+            (
+                "onehot_age_fm_et",
+                OneHotEncoder(),
+                ["Age", "FamilyMembers", "Employment Type"],
+            ),
+            (
+                "onehot_dropfirst",
+                OneHotEncoder(drop="first"),
+                ["GraduateOrNot", "FrequentFlyer", "EverTravelledAbroad"],
+            ),
+        ],
+        remainder="passthrough",
+    )
+
+    results = []
+    for name, classifier in CLASSIFIERS.items():
+        pipeline = Pipeline(
+            [("preprocessor", preprocessor), ("classifier", classifier)]
+        ).fit(X_vars, y_array)
+        result = fast_inference.latency_benchmark(pipeline, records)
+        result.insert(0, "Model", name)
+        results.append(result)
+
+    with pd.option_context("display.width", 200):
+        print(pd.concat(results).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Benchmark suite of the helper modules on synthetic data of growing size.
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py                      # 10^3..10^5 rows
+    python benchmarks/run_benchmarks.py --sizes 3 4 5 6 7    # up to 10^7 rows
+    python benchmarks/run_benchmarks.py --projects wine --cases outliers
+    python benchmarks/run_benchmarks.py --compare latest     # compare with last run
+
+Every run is saved to benchmarks/results/<timestamp>[-label].json.
+"""
+
+import argparse
+import importlib
+import warnings
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from harness import (
+    compare_results,
+    load_helpers,
+    load_results,
+    measure,
+    save_results,
+    synthetic_frame,
+)
+
+# (case name, maximum number of rows, factory: (helpers module, df) -> callable)
+Case = Tuple[str, int, Callable[[Any, pd.DataFrame], Callable[[], Any]]]
+
+
+def _best_tuned_model_case(
+    helpers: Any, df: pd.DataFrame, search: str = "grid"
+) -> Callable[[], Any]:
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("minmax_scaler", MinMaxScaler(), ["AnnualIncome"]),
+            (
+                "onehot_age_fm_et",
+                OneHotEncoder(handle_unknown="ignore"),
+                ["Age", "FamilyMembers", "Employment Type"],
+            ),
+            (
+                "onehot_dropfirst",
+                OneHotEncoder(drop="first"),
+                ["GraduateOrNot", "FrequentFlyer", "EverTravelledAbroad"],
+            ),
+        ],
+        remainder="passthrough",
+    )
+    pipeline = Pipeline(
+        [("preprocessor", preprocessor), ("classifier", LogisticRegression())]
+    )
+    param_grid = {
+        "classifier__C": [0.1, 1.0],
+        "classifier__class_weight": [None, "balanced"],
+    }
+    X_vars = df.drop(columns=["TravelInsurance"])
+    y_array = df["TravelInsurance"].to_numpy()
+    kf = StratifiedKFold(n_splits=3, shuffle=True, random_state=2024)
+
+    def run() -> Any:
+        models_df = pd.DataFrame({"Model": ["Logistic Regression"]})
+        return helpers.best_tuned_model(
+            pipeline,
+            param_grid,
+            kf,
+            X_vars,
+            y_array,
+            models_df,
+            "Logistic Regression",
+            {},
+            search=search,
+            n_iter=4,
+            random_state=2024,
+        )
+
+    return run
+
+
+def _travel_binary(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.rename(columns={"Employment Type": "Government Sector"})
+    df["Government Sector"] = df["Government Sector"].replace(
+        {"Government Sector": "Yes", "Private Sector/Self Employed": "No"}
+    )
+    df["ChronicDiseases"] = df["ChronicDiseases"].replace({1: "Yes", 0: "No"})
+    return df
+
+
+TRAVEL_BINARY_FEATURES = [
+    "Government Sector",
+    "GraduateOrNot",
+    "ChronicDiseases",
+    "FrequentFlyer",
+    "EverTravelledAbroad",
+]
+
+
+def _ztest_case(helpers: Any, df: pd.DataFrame) -> Callable[[], Any]:
+    data = _travel_binary(df)
+    return lambda: helpers.ztest_proportions_of_1(
+        data, "FrequentFlyer", "TravelInsurance"
+    )
+
+
+def _binary_features_case(helpers: Any, df: pd.DataFrame) -> Callable[[], Any]:
+    data = _travel_binary(df)
+    return lambda: helpers.binary_features_tests(
+        data, TRAVEL_BINARY_FEATURES, "TravelInsurance"
+    )
+
+
+CASES: Dict[str, Tuple[str, List[Case]]] = {
+    "wine": (
+        "m2s3_helpers",
+        [
+            (
+                "any_outliers_iqr",
+                10**7,
+                lambda h, df: lambda: h.any_outliers_iqr(df, "chlorides", False),
+            ),
+            (
+                "outliers_all_columns",
+                10**7,
+                lambda h, df: lambda: h.outliers_all_columns(
+                    df.drop(columns=["quality"])
+                ),
+            ),
+            (
+                "corr_bar (incl. spearman matrix)",
+                10**7,
+                lambda h, df: lambda: h.corr_bar(df.corr(method="spearman"), "quality"),
+            ),
+            (
+                "corr_bar (cached correlation engine)",
+                10**7,
+                lambda h, df: lambda: h.corr_bar(df, "quality", method="spearman"),
+            ),
+            (
+                "hist_box_eda (render stubbed)",
+                10**6,
+                lambda h, df: lambda: h.hist_box_eda(
+                    df, "alcohol", "Alcohol", "Fig.0", "none", stat_print=False
+                ),
+            ),
+        ],
+    ),
+    "travel": (
+        "m3s1_helpers",
+        [
+            (
+                "ttest_with_assumptions_check",
+                10**7,
+                lambda h, df: lambda: h.ttest_with_assumptions_check(
+                    df, "AnnualIncome", "TravelInsurance"
+                ),
+            ),
+            (
+                "ttest_batch (3 features)",
+                10**7,
+                lambda h, df: lambda: h.ttest_batch(
+                    df, ["Age", "AnnualIncome", "FamilyMembers"], "TravelInsurance"
+                ),
+            ),
+            ("ztest_proportions_of_1", 10**7, _ztest_case),
+            ("binary_features_tests (5 features)", 10**7, _binary_features_case),
+            (
+                "local_conversion_rate_scatter (render stubbed)",
+                10**6,
+                lambda h, df: lambda: h.local_conversion_rate_scatter(
+                    df,
+                    "AnnualIncome",
+                    "Annual Income",
+                    "TravelInsurance",
+                    df["TravelInsurance"].mean(),
+                    "Fig.0",
+                    "none",
+                ),
+            ),
+            (
+                "hist_box_eda (render stubbed)",
+                10**6,
+                lambda h, df: lambda: h.hist_box_eda(
+                    df, "AnnualIncome", "Income", "Fig.0", "none", stat_print=False
+                ),
+            ),
+            *[
+                (
+                    f"best_tuned_model ({search}, 4 candidates)",
+                    10**5,
+                    lambda h, df, search=search: _best_tuned_model_case(h, df, search),
+                )
+                for search in ("grid", "random", "halving_grid", "halving_random")
+            ],
+        ],
+    ),
+    "cookie_cats": (
+        "bootstrap",
+        [
+            (
+                "bootstrap_means (1000 replicates)",
+                10**7,
+                lambda h, df: lambda: h.bootstrap_means(
+                    df,
+                    "version",
+                    {"gate_30": "control", "gate_40": "experiment"},
+                    {"retention_1": "r1", "retention_7": "r7"},
+                    sample_size=max(1, len(df) // 4),
+                ),
+            ),
+        ],
+    ),
+}
+
+
+def run(args: argparse.Namespace) -> pd.DataFrame:
+    """
+    Runs selected benchmark cases for all sizes and returns the records.
+    """
+    records = []
+    for project in args.projects:
+        module_name, cases = CASES[project]
+        load_helpers(project)
+        helpers = importlib.import_module(f"{project}_helpers.{module_name}")
+
+        for exponent in args.sizes:
+            n_rows = 10**exponent
+            selected = [
+                case
+                for case in cases
+                if n_rows <= case[1]
+                and (not args.cases or any(c in case[0] for c in args.cases))
+            ]
+            if not selected:
+                continue
+
+            df = synthetic_frame(project, n_rows)
+            for name, _, factory in selected:
+                result = measure(factory(helpers, df), repeat=args.repeat)
+                records.append(
+                    {"project": project, "case": name, "rows": n_rows, **result}
+                )
+                print(
+                    f"{project:12} {name:48} {n_rows:>9} rows "
+                    f"{result['min_s']:9.4f} s {result['peak_mb']:9.1f} MB"
+                )
+
+    return pd.DataFrame(records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[3, 4, 5],
+        help="exponents of row counts (default: 3 4 5 - i.e. 10^3..10^5 rows)",
+    )
+    parser.add_argument(
+        "--projects", nargs="+", choices=list(CASES), default=list(CASES)
+    )
+    parser.add_argument(
+        "--cases", nargs="*", help="run only cases containing any of these strings"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed calls per case")
+    parser.add_argument("--label", default="", help="label added to results file")
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const="latest",
+        help="results file to compare with ('latest' - the last saved run)",
+    )
+    parser.add_argument("--no-save", action="store_true", help="do not save results")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    previous = None
+    if args.compare:
+        previous = load_results(None if args.compare == "latest" else args.compare)
+
+    records = run(args)
+
+    if not args.no_save and not records.empty:
+        print(
+            "\nResults saved to", save_results(records.to_dict("records"), args.label)
+        )
+
+    if previous is not None and not records.empty:
+        with pd.option_context("display.width", 200, "display.max_rows", None):
+            print(compare_results(records, previous).round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    np.seterr(all="ignore")
+    main()
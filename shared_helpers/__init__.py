@@ -0,0 +1,29 @@
+"""
+Helpers shared by the portfolio projects.
+
+Submodules are imported on first attribute access (shared_helpers.stats etc.)
+and heavy dependencies (Plotly, SciPy, statsmodels, scikit-learn, IPython)
+only when a function needing them is called.
+"""
+
+import importlib
+from typing import Any
+
+SUBMODULES = (
+    "chunking",
+    "data_cache",
+    "display",
+    "instrumentation",
+    "outliers",
+    "plotting",
+    "stats",
+    "tuning",
+)
+
+__all__ = list(SUBMODULES)
+
+
+def __getattr__(name: str) -> Any:
+    if name in SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,23 @@
+"""
+Memory-bounded chunking of vectorized simulations (bootstrap replicates,
+permutations, power scenarios), which are split into chunks with seeds of
+their own, so results do not depend on the number of worker processes.
+"""
+
+from typing import List
+
+
+def rows_per_chunk(max_chunk_mb: float, row_bytes: float) -> int:
+    """
+    Number of rows (replicates, permutations, ...) of a chunk that fits
+    into max_chunk_mb, given the memory of one row in bytes (at least 1).
+    """
+    return max(1, int(max_chunk_mb * 1024**2 // row_bytes))
+
+
+def chunk_sizes(n_rows: int, chunk_size: int) -> List[int]:
+    """
+    Splits the number of rows into chunks of at most chunk_size.
+    """
+    full, rest = divmod(n_rows, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else [])
@@ -0,0 +1,293 @@
+"""
+Columnar cache of the portfolio datasets.
+
+Every CSV is parsed once, converted to compact dtypes and stored as Feather
+(uncompressed Arrow IPC, read with memory mapping - only requested columns are
+touched) or Parquet (compressed). The cache is rebuilt when the source CSV
+changes (size or modification time) or when dtype rules change.
+
+A DataFrame is a copy of the loaded columns in pandas memory, so its memory
+saving comes from the compact dtypes. With as_arrow=True the Arrow table is
+returned instead; columns of a Feather table stay memory mapped (zero-copy).
+
+Usage:
+    from shared_helpers.data_cache import load_dataset
+
+    df = load_dataset("cookie_cats")
+    df = load_dataset("travel", columns=["Age", "AnnualIncome", "TravelInsurance"])
+    table = load_dataset("cookie_cats", as_arrow=True)
+"""
+
+import json
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(REPO_DIR, ".data_cache")
+CACHE_VERSION = 1
+
+DATASETS: Dict[str, str] = {
+    "mental_health": os.path.join(
+        "1-mental-health-in-IT", "dataset", "mental_health.csv"
+    ),
+    "mental_health_questions": os.path.join(
+        "1-mental-health-in-IT", "dataset", "question_list.csv"
+    ),
+    "cookie_cats": os.path.join(
+        "2-AB-testing", "Cookie_Cats", "datasets", "cookie_cats.csv"
+    ),
+    "fast_food": os.path.join(
+        "2-AB-testing", "Fast_Food_Promo", "datasets", "WA_Marketing-Campaign.csv"
+    ),
+    "wine": os.path.join("3-wine-quality-model", "data", "winequality-red.csv"),
+    "travel": os.path.join(
+        "4-travel-insurance-model", "data", "TravelInsurancePrediction.csv"
+    ),
+}
+
+# Columns always stored as categoricals (in addition to low-cardinality text columns)
+CATEGORICAL: Dict[str, List[str]] = {
+    "cookie_cats": ["version"],
+    "fast_food": ["MarketSize"],
+    "travel": ["Employment Type"],
+}
+
+MAX_CATEGORY_RATIO = 0.5
+MAX_FLOAT32_DECIMALS = 6
+
+
+def _decimals(values: np.ndarray) -> Optional[int]:
+    """
+    Number of decimal places of float values (None if more than
+    MAX_FLOAT32_DECIMALS).
+    """
+    for decimals in range(MAX_FLOAT32_DECIMALS + 1):
+        if np.array_equal(np.round(values, decimals), values):
+            return decimals
+    return None
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    categorical: Optional[List[str]] = None,
+    float32: bool = True,
+) -> pd.DataFrame:
+    """
+    Converts columns of DataFrame to compact dtypes:
+    - columns in categorical and text columns with few distinct values
+      (at most MAX_CATEGORY_RATIO of rows) to category,
+    - text columns with True/False values only to bool,
+    - integer columns to the smallest integer dtype,
+    - float columns with integer values (and no NaN) to integers,
+    - float columns to float32 where safe - values rounded to their original
+      number of decimal places are unchanged.
+
+    Params:
+    df                DataFrame to convert
+    categorical       Columns converted to category (default None)
+    float32           Allow float32 for float columns (default True)
+
+    Returns:
+    Converted DataFrame (copy).
+    """
+    df = df.copy()
+    categorical = set(categorical or [])
+
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+
+        if col in categorical:
+            df[col] = series.astype("category")
+
+        elif pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+
+        elif pd.api.types.is_float_dtype(series):
+            values = series.to_numpy()
+            finite = values[~np.isnan(values)]
+            if len(finite) == len(values) and np.array_equal(finite, np.round(finite)):
+                df[col] = pd.to_numeric(series.astype(np.int64), downcast="integer")
+            elif float32:
+                decimals = _decimals(finite)
+                as_float32 = finite.astype(np.float32).astype(np.float64)
+                if decimals is not None and np.array_equal(
+                    np.round(as_float32, decimals), finite
+                ):
+                    df[col] = series.astype(np.float32)
+
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(
+            series
+        ):
+            distinct = set(series.dropna().unique())
+            if distinct and distinct <= {"True", "False"} and not series.isna().any():
+                df[col] = series == "True"
+            elif series.nunique() <= MAX_CATEGORY_RATIO * max(len(series), 1):
+                df[col] = series.astype("category")
+
+    return df
+
+
+def _source_signature(source: str) -> Dict[str, object]:
+    stat = os.stat(source)
+    return {
+        "source": os.path.abspath(source),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "cache_version": CACHE_VERSION,
+    }
+
+
+def cache_path(
+    name: str, cache_dir: Optional[str] = None, format: str = "feather"
+) -> str:
+    """
+    Path of the cache file of a dataset.
+    """
+    extension = {"feather": "feather", "parquet": "parquet"}[format]
+    return os.path.join(cache_dir or CACHE_DIR, f"{name}.{extension}")
+
+
+def _resolve(name: str) -> Tuple[str, str]:
+    if name in DATASETS:
+        return name, os.path.join(REPO_DIR, DATASETS[name])
+    base_name = os.path.splitext(os.path.basename(name))[0]
+    return base_name, name
+
+
+def build_cache(
+    name: str,
+    cache_dir: Optional[str] = None,
+    format: str = "feather",
+    float32: bool = True,
+) -> str:
+    """
+    Parses a dataset CSV, optimizes dtypes and writes the cache file with
+    signature of the source.
+
+    Params:
+    name              Registered dataset name (see DATASETS) or path of a CSV
+    cache_dir         Cache directory (default .data_cache in repository root)
+    format            "feather" (memory mapped, default) or "parquet" (compressed)
+    float32           Allow float32 for float columns (default True)
+
+    Returns:
+    Path of the cache file.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as parquet
+
+    key, source = _resolve(name)
+    path = cache_path(key, cache_dir, format)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    df = optimize_dtypes(pd.read_csv(source), CATEGORICAL.get(key), float32)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {
+            **(table.schema.metadata or {}),
+            b"source_signature": json.dumps(_source_signature(source)).encode(),
+            b"float32": json.dumps(float32).encode(),
+        }
+    )
+
+    tmp_path = path + ".tmp"
+    if format == "feather":
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+    else:
+        parquet.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def _cache_is_valid(path: str, source: str, format: str, float32: bool) -> bool:
+    import pyarrow.parquet as parquet
+    from pyarrow import ipc
+
+    if not os.path.exists(path):
+        return False
+    if format == "feather":
+        with ipc.open_file(path) as reader:
+            metadata = reader.schema.metadata or {}
+    else:
+        metadata = parquet.read_schema(path).metadata or {}
+
+    try:
+        signature = json.loads(metadata[b"source_signature"])
+        cached_float32 = json.loads(metadata[b"float32"])
+    except (KeyError, ValueError):
+        return False
+    return signature == _source_signature(source) and cached_float32 == float32
+
+
+def load_dataset(
+    name: str,
+    columns: Optional[List[str]] = None,
+    cache_dir: Optional[str] = None,
+    format: str = "feather",
+    float32: bool = True,
+    refresh: bool = False,
+    as_arrow: bool = False,
+) -> Union[pd.DataFrame, "pa.Table"]:
+    """
+    Loads a dataset from the columnar cache, building (or rebuilding when the
+    source CSV changed) the cache first.
+
+    Params:
+    name              Registered dataset name (see DATASETS) or path of a CSV
+    columns           Columns to load (default None - all columns)
+    cache_dir         Cache directory (default .data_cache in repository root)
+    format            "feather" (memory mapped, default) or "parquet" (compressed)
+    float32           Allow float32 for float columns (default True)
+    refresh           Rebuild the cache unconditionally (default False)
+    as_arrow          Return the pyarrow Table without conversion to pandas
+                      (zero-copy, memory mapped for "feather"; default False)
+
+    Returns:
+    DataFrame with compact dtypes (copied from the cache file) or pyarrow Table.
+    """
+    import pyarrow.feather as feather
+    import pyarrow.parquet as parquet
+
+    if format not in ("feather", "parquet"):
+        raise ValueError(f"Unknown format '{format}', use 'feather' or 'parquet'.")
+
+    key, source = _resolve(name)
+    path = cache_path(key, cache_dir, format)
+    if refresh or not _cache_is_valid(path, source, format, float32):
+        build_cache(name, cache_dir, format, float32)
+
+    if format == "feather":
+        table = feather.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = parquet.read_table(path, columns=columns, memory_map=True)
+    if as_arrow:
+        return table
+    return table.to_pandas()
+
+
+def clear_cache(cache_dir: Optional[str] = None) -> int:
+    """
+    Removes all cache files.
+
+    Returns:
+    Number of removed files.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return 0
+    removed = 0
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith((".feather", ".parquet")):
+            os.remove(entry.path)
+            removed += 1
+    return removed
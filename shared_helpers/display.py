@@ -0,0 +1,140 @@
+"""
+Display backend of the shared helpers.
+
+Markdown, images, figures and other objects are shown through one of the backends:
+- "jupyter": IPython.display / Figure.show (default inside a Jupyter kernel),
+- "text": plain text printed to stdout (default in scripts and batch runs),
+- "json": one JSON object per line printed to stdout (for log collection).
+
+The backend is detected on first use, can be set with the HELPERS_DISPLAY
+environment variable or with set_backend.
+
+Usage:
+    from shared_helpers.display import set_backend
+
+    set_backend("json")
+"""
+
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Optional
+
+BACKENDS = ("jupyter", "text", "json")
+ENV_VARIABLE = "HELPERS_DISPLAY"
+
+_backend: Optional[str] = None
+
+
+def _in_jupyter() -> bool:
+    """
+    Checks whether code runs in a Jupyter kernel (without importing IPython).
+    """
+    ipython = sys.modules.get("IPython")
+    if ipython is None:
+        return False
+    shell = ipython.get_ipython()
+    return shell is not None and hasattr(shell, "kernel")
+
+
+def _check(name: str) -> str:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown display backend '{name}', use one of {BACKENDS}.")
+    return name
+
+
+def get_backend() -> str:
+    """
+    Current backend: set with set_backend, else HELPERS_DISPLAY, else
+    "jupyter" inside a Jupyter kernel and "text" otherwise.
+    """
+    if _backend is not None:
+        return _backend
+    if os.environ.get(ENV_VARIABLE):
+        return _check(os.environ[ENV_VARIABLE])
+    return "jupyter" if _in_jupyter() else "text"
+
+
+def set_backend(name: Optional[str]) -> None:
+    """
+    Sets the backend ("jupyter", "text" or "json"; None - detect again).
+    """
+    global _backend
+    _backend = None if name is None else _check(name)
+
+
+def _print_json(payload: Dict[str, Any]) -> None:
+    print(json.dumps(payload, default=str), flush=True)
+
+
+def markdown_to_text(text: str) -> str:
+    """
+    Plain text of the Markdown used by the helpers: line breaks for <br>,
+    without emphasis and code marks and without indentation of lines.
+    """
+    text = re.sub(r"<br\s*/?>[ \t]*\n?", "\n", text)
+    text = re.sub(r"\*\*|`|</?i>", "", text)
+    return "\n".join(line.strip() for line in text.splitlines()).strip()
+
+
+def show_markdown(text: str) -> None:
+    """
+    Shows Markdown text.
+    """
+    backend = get_backend()
+    if backend == "jupyter":
+        from IPython.display import Markdown, display
+
+        display(Markdown(text))
+    elif backend == "json":
+        _print_json({"type": "markdown", "text": text})
+    else:
+        print(markdown_to_text(text))
+
+
+def show_image(path: str) -> None:
+    """
+    Shows an image file (the path only outside Jupyter).
+    """
+    backend = get_backend()
+    if backend == "jupyter":
+        from IPython.display import Image, display
+
+        display(Image(path))
+    elif backend == "json":
+        _print_json({"type": "image", "path": path})
+    else:
+        print(f"[image: {path}]")
+
+
+def show_figure(fig: Any) -> None:
+    """
+    Shows a Plotly figure interactively (title and number of traces only
+    outside Jupyter, so no browser is opened in batch runs).
+    """
+    backend = get_backend()
+    if backend == "jupyter":
+        fig.show()
+        return
+    title = markdown_to_text(fig.layout.title.text or "")
+    if backend == "json":
+        _print_json({"type": "figure", "title": title, "traces": len(fig.data)})
+    else:
+        print(f"[figure: {title}, {len(fig.data)} traces]")
+
+
+def show(obj: Any) -> None:
+    """
+    Shows any object with a rich (e.g. HTML) representation in Jupyter and
+    its str() outside Jupyter.
+    """
+    backend = get_backend()
+    if backend == "jupyter":
+        from IPython.display import display
+
+        display(obj)
+    elif backend == "json":
+        _print_json({"type": "text", "text": str(obj)})
+    else:
+        print(obj)
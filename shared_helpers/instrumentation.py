@@ -0,0 +1,488 @@
+"""
+Opt-in timing and memory instrumentation of the helper modules.
+
+While enabled, public functions of the instrumented modules (and public
+methods of classes defined there, e.g. CorrelationEngine) are replaced by
+wrappers recording wall time, CPU time, tracemalloc peak and input shape of
+every call. Helpers mark sub-phases of a call (e.g. construction vs render in
+hist_box_eda, fit vs score in tuning) through two module-level hooks, which are
+no-ops until a module is instrumented:
+
+    _phase(name)                  context manager timing a block of a call
+    _record_phase(name, seconds)  time measured elsewhere (e.g. in workers)
+
+When disabled, original functions and hooks are restored, so instrumentation
+costs nothing.
+
+Usage:
+    import sys
+    sys.path.append("..")  # repository root, from a project folder
+
+    import helpers.m3s1_helpers as m3s1_helpers
+    from shared_helpers import plotting, stats, tuning
+    from shared_helpers.instrumentation import profiler
+
+    modules = [m3s1_helpers, plotting, stats, tuning]
+    profiler.enable(modules, namespace=globals())
+    ...  # notebook cells
+    profiler.report()
+    profiler.save("profile.json")
+    profiler.disable()
+"""
+
+import functools
+import inspect
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import nullcontext
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+RECORD_COLUMNS = [
+    "id",
+    "parent",
+    "depth",
+    "kind",
+    "function",
+    "phase",
+    "shape",
+    "start_s",
+    "wall_s",
+    "cpu_s",
+    "peak_mb",
+    "error",
+]
+
+
+def _input_shape(args: tuple, kwargs: dict) -> Optional[str]:
+    """
+    Shape of the first argument with a shape (DataFrame, Series, array),
+    else length of the first list or dict argument.
+    """
+    values = list(args) + list(kwargs.values())
+    for value in values:
+        shape = getattr(value, "shape", None)
+        if isinstance(shape, tuple):
+            return str(shape)
+    for value in values:
+        if isinstance(value, (list, dict)):
+            return f"({len(value)},)"
+    return None
+
+
+class _Measurement:
+    """
+    Context manager measuring one call or phase. Peak memory of nested
+    measurements is tracked with tracemalloc.reset_peak: the peak seen before
+    a child starts (and the child's peak) is propagated to the parent.
+    """
+
+    __slots__ = (
+        "profiler",
+        "kind",
+        "function",
+        "phase",
+        "shape",
+        "id",
+        "parent",
+        "depth",
+        "start_wall",
+        "start_cpu",
+        "start_memory",
+        "peak",
+    )
+
+    def __init__(
+        self,
+        profiler: "Profiler",
+        kind: str,
+        function: Optional[str],
+        phase: Optional[str],
+        shape: Optional[str],
+    ):
+        self.profiler = profiler
+        self.kind = kind
+        self.function = function
+        self.phase = phase
+        self.shape = shape
+
+    def __enter__(self) -> "_Measurement":
+        profiler = self.profiler
+        stack = profiler._stack
+        parent = stack[-1] if stack else None
+        if profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = self.peak = current
+        self.parent = parent.id if parent is not None else None
+        self.depth = len(stack)
+        self.id = profiler._next_id
+        profiler._next_id += 1
+        stack.append(self)
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> bool:
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        profiler = self.profiler
+        profiler._stack.pop()
+
+        peak_mb = np.nan
+        if profiler.memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            peak_mb = (self.peak - self.start_memory) / 1024**2
+            if profiler._stack:
+                parent = profiler._stack[-1]
+                parent.peak = max(parent.peak, self.peak)
+
+        profiler._records.append(
+            (
+                self.id,
+                self.parent,
+                self.depth,
+                self.kind,
+                self.function,
+                self.phase,
+                self.shape,
+                self.start_wall - profiler._start,
+                wall,
+                cpu,
+                peak_mb,
+                exc_type.__name__ if exc_type is not None else "",
+            )
+        )
+        return False
+
+
+class Profiler:
+    """
+    Collects call and phase records of instrumented modules for one run.
+
+    Records of a run are kept in memory as tuples; report() aggregates them by
+    function and phase. Work done in worker processes (joblib, process pools)
+    is included in wall time of the calling function only, CPU time and
+    memory are of the current process.
+    """
+
+    def __init__(self, label: str = ""):
+        """
+        Params:
+        label             Name of the run stored in saved reports (default "")
+        """
+        self.label = label
+        self.enabled = False
+        self.memory = False
+        self._started_tracemalloc = False
+        self._patches: List[tuple] = []
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Removes all records and starts a new run.
+        """
+        self._records: List[tuple] = []
+        self._stack: List[_Measurement] = []
+        self._next_id = 0
+        self._start = time.perf_counter()
+        self.created = time.time()
+
+    # instrumentation
+
+    def _wrap(self, func: Callable, name: str) -> Callable:
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Measurement(profiler, "call", name, None, _input_shape(args, kwargs)):
+                return func(*args, **kwargs)
+
+        wrapper.__instrumented__ = True
+        return wrapper
+
+    def _patch(self, owner: Any, attribute: str, value: Any) -> None:
+        self._patches.append((owner, attribute, owner.__dict__[attribute]))
+        setattr(owner, attribute, value)
+
+    def instrument(
+        self, module: ModuleType, namespaces: Optional[List[Dict[str, Any]]] = None
+    ) -> List[str]:
+        """
+        Wraps public functions of a module and public methods of classes
+        defined in the module, and connects the module's _phase and
+        _record_phase hooks to the profiler.
+
+        Params:
+        module            Helpers module (e.g. shared_helpers.plotting)
+        namespaces        Namespaces with names imported from the module, e.g.
+                          globals() of a notebook after 'from ... import *' or
+                          vars() of a project module re-exporting shared helpers
+                          (default None)
+
+        Returns:
+        Names of wrapped functions and methods.
+        """
+        # records are named "<module>.<function>", e.g. "plotting.hist_box_eda"
+        prefix = module.__name__.rsplit(".", 1)[-1]
+        wrapped = {}
+        for name, value in list(vars(module).items()):
+            if name.startswith("_") or getattr(value, "__module__", None) != (
+                module.__name__
+            ):
+                continue
+            if inspect.isfunction(value) and not hasattr(value, "__instrumented__"):
+                wrapper = self._wrap(value, f"{prefix}.{name}")
+                self._patch(module, name, wrapper)
+                wrapped[name] = (value, wrapper)
+            elif inspect.isclass(value):
+                for method_name, method in list(vars(value).items()):
+                    if method_name.startswith("_") or not inspect.isfunction(method):
+                        continue
+                    if hasattr(method, "__instrumented__"):
+                        continue
+                    qualified = f"{prefix}.{name}.{method_name}"
+                    self._patch(value, method_name, self._wrap(method, qualified))
+                    wrapped[qualified] = (method, None)
+
+        if "_phase" in vars(module):
+            self._patch(module, "_phase", self.phase)
+        if "_record_phase" in vars(module):
+            self._patch(module, "_record_phase", self.record_phase)
+
+        originals = {id(original): wrapper for original, wrapper in wrapped.values()}
+        for namespace in namespaces or []:
+            for name, value in list(namespace.items()):
+                if id(value) in originals and originals[id(value)] is not None:
+                    self._patches.append((namespace, name, value))
+                    namespace[name] = originals[id(value)]
+
+        return list(wrapped)
+
+    def enable(
+        self,
+        modules: List[ModuleType],
+        namespace: Optional[Dict[str, Any]] = None,
+        memory: bool = True,
+        label: Optional[str] = None,
+    ) -> "Profiler":
+        """
+        Instruments modules and starts a new run.
+
+        Names re-exported by one instrumented module from another (e.g.
+        fig_px_render in helpers.m3s1_helpers from shared_helpers.plotting)
+        are replaced by wrappers as well.
+
+        Params:
+        modules           Helpers modules to instrument
+        namespace         Namespace with names imported from the modules (default None)
+        memory            Measure peak memory with tracemalloc (default True; tracing
+                          slows allocation-heavy code down)
+        label             Name of the run (default None - keep current label)
+        """
+        if self.enabled:
+            self.disable()
+        if label is not None:
+            self.label = label
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        namespaces = [vars(module) for module in modules]
+        if namespace is not None:
+            namespaces.append(namespace)
+        for module in modules:
+            self.instrument(module, namespaces)
+        self.enabled = True
+        self.reset()
+        return self
+
+    def disable(self) -> None:
+        """
+        Restores original functions, methods and hooks. Records are kept.
+        """
+        for owner, attribute, original in reversed(self._patches):
+            if isinstance(owner, dict):
+                owner[attribute] = original
+            else:
+                setattr(owner, attribute, original)
+        self._patches.clear()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.memory = False
+        self.enabled = False
+
+    def phase(self, name: str) -> Any:
+        """
+        Context manager recording a sub-phase of the current call (or a
+        top-level block when used directly in a notebook).
+        """
+        if not self.enabled:
+            return nullcontext()
+        function = self._stack[-1].function if self._stack else None
+        return _Measurement(self, "phase", function, name, None)
+
+    def record_phase(self, name: str, seconds: float) -> None:
+        """
+        Records a sub-phase of the current call timed elsewhere, e.g. summed
+        fit times of cross validation folds run in worker processes.
+        """
+        if not self.enabled:
+            return
+        parent = self._stack[-1] if self._stack else None
+        self._records.append(
+            (
+                self._next_id,
+                parent.id if parent is not None else None,
+                len(self._stack),
+                "external",
+                parent.function if parent is not None else None,
+                name,
+                None,
+                time.perf_counter() - self._start,
+                float(seconds),
+                np.nan,
+                np.nan,
+                "",
+            )
+        )
+        self._next_id += 1
+
+    # reporting
+
+    def records(self) -> pd.DataFrame:
+        """
+        All records of the run in order of start with exclusive wall time of
+        calls ("self_s": wall time minus instrumented calls nested in the
+        call, also inside its phases).
+        """
+        records_df = (
+            pd.DataFrame(self._records, columns=RECORD_COLUMNS)
+            .sort_values("id")
+            .reset_index(drop=True)
+        )
+
+        # nearest enclosing call of every record (phases are skipped)
+        kinds = dict(zip(records_df["id"], records_df["kind"]))
+        parents = dict(zip(records_df["id"], records_df["parent"]))
+
+        def caller(parent: Any) -> Any:
+            while not pd.isna(parent) and kinds.get(parent) != "call":
+                parent = parents.get(parent)
+            return parent
+
+        calls = records_df[records_df["kind"] == "call"]
+        nested = calls["wall_s"].groupby(calls["parent"].map(caller)).sum()
+        records_df["self_s"] = records_df["wall_s"] - records_df["id"].map(
+            nested
+        ).fillna(0.0)
+        records_df.loc[records_df["kind"] != "call", "self_s"] = np.nan
+        return records_df
+
+    def report(self) -> pd.DataFrame:
+        """
+        Report of the run: records aggregated by function and phase.
+        """
+        return summarize(self.records())
+
+    def save(self, path: str) -> str:
+        """
+        Saves the run: JSON (metadata, records and report) or CSV (report
+        only), chosen by file extension.
+
+        Returns:
+        Path of the saved file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.endswith(".csv"):
+            self.report().to_csv(path, index=False)
+            return path
+
+        records_df = self.records()
+        content = {
+            "label": self.label,
+            "created": self.created,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "records": json.loads(records_df.to_json(orient="records")),
+            "report": json.loads(summarize(records_df).to_json(orient="records")),
+        }
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(content, report_file, indent=1)
+        return path
+
+
+def summarize(records_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates records by function and phase ("" for whole calls): number of
+    calls, total, mean and maximum wall time, total exclusive and CPU time,
+    maximum peak memory and distinct input shapes; sorted by total wall time.
+    """
+    records_df = records_df.assign(
+        function=records_df["function"].fillna(""),
+        phase=records_df["phase"].fillna(""),
+    )
+    report_df = (
+        records_df.groupby(["function", "phase"], sort=False)
+        .agg(
+            calls=("wall_s", "size"),
+            wall_total_s=("wall_s", "sum"),
+            wall_mean_s=("wall_s", "mean"),
+            wall_max_s=("wall_s", "max"),
+            self_total_s=("self_s", lambda values: values.sum(min_count=1)),
+            cpu_total_s=("cpu_s", lambda values: values.sum(min_count=1)),
+            peak_mb=("peak_mb", "max"),
+            shapes=("shape", lambda shapes: ", ".join(shapes.dropna().unique())),
+            errors=("error", lambda errors: int((errors != "").sum())),
+        )
+        .reset_index()
+    )
+    return report_df.sort_values("wall_total_s", ascending=False).reset_index(drop=True)
+
+
+def load_report(path: str) -> pd.DataFrame:
+    """
+    Loads the report of a saved run (JSON or CSV).
+    """
+    if path.endswith(".csv"):
+        return pd.read_csv(path).fillna({"function": "", "phase": "", "shapes": ""})
+    with open(path, encoding="utf-8") as report_file:
+        content = json.load(report_file)
+    return summarize(pd.DataFrame(content["records"]))
+
+
+def compare_reports(current: pd.DataFrame, previous: pd.DataFrame) -> pd.DataFrame:
+    """
+    Joins reports of two runs on function and phase and computes time and
+    memory ratios (current / previous; above 1 means slower or more memory).
+    """
+    keys = ["function", "phase"]
+    merged = current.merge(previous, on=keys, how="outer", suffixes=("", "_prev"))
+    merged["time_ratio"] = merged["wall_total_s"] / merged["wall_total_s_prev"]
+    merged["memory_ratio"] = merged["peak_mb"] / merged["peak_mb_prev"]
+    return merged[
+        keys
+        + [
+            "calls",
+            "calls_prev",
+            "wall_total_s",
+            "wall_total_s_prev",
+            "time_ratio",
+            "peak_mb",
+            "memory_ratio",
+        ]
+    ].sort_values("wall_total_s", ascending=False, ignore_index=True)
+
+
+profiler = Profiler()
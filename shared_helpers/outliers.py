@@ -0,0 +1,168 @@
+"""
+Outlier detection shared by the projects: IQR report of one column and
+bounds (IQR, z-score, MAD) and outlier masks of many columns at once.
+
+Depends on NumPy and pandas only.
+"""
+
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+def any_outliers_iqr(
+    df: pd.DataFrame, col_name: str, print_flag: bool = True
+) -> pd.DataFrame:
+    """
+    This function uses IQR method for identification of outliers in a column of DataFrame.
+
+    Parameters:
+    df          pd.DataFrame    The DataFrame where we are looking for outliers
+    col_name    str             column of the DataFrame in which we are looking for outliers
+    print_flag  bool            flag, indicating whether to print outlier information
+
+    Returns:
+    df_outliers pd.DataFrame    Prints text message for user if there are any top or bottom
+                                outliers in the specified column. Returns a DataFrame with
+                                all outliers from initial DataFrame.
+    """
+    df_outliers = pd.DataFrame()
+
+    min_value = df[col_name].min()
+    max_value = df[col_name].max()
+
+    q1 = df[col_name].quantile(0.25)
+    q3 = df[col_name].quantile(0.75)
+
+    iqr = q3 - q1
+
+    bottom_limit = round(q1 - 1.5 * iqr, 6)
+    top_limit = round(q3 + 1.5 * iqr, 6)
+
+    if bottom_limit <= min_value and top_limit >= max_value:
+        print(f"There are no outliers in '{col_name}'.") if print_flag else None
+
+    if bottom_limit > min_value:
+        lower_rows = df[df[col_name] < bottom_limit]
+        lower_count = lower_rows.shape[0]
+        (
+            print(
+                f"There are {int(lower_count)} bottom outliers in '{col_name}' below {bottom_limit}"
+            )
+            if print_flag
+            else None
+        )
+        df_outliers = pd.concat([df_outliers, lower_rows])
+
+    if top_limit < max_value:
+        upper_rows = df[df[col_name] > top_limit]
+        upper_count = upper_rows.shape[0]
+        (
+            print(
+                f"There are {int(upper_count)} top outliers in '{col_name}' above {top_limit}"
+            )
+            if print_flag
+            else None
+        )
+
+        df_outliers = pd.concat([df_outliers, upper_rows])
+
+    df_output = df_outliers.sort_values(by=col_name, ascending=False)
+
+    return df_output
+
+
+def iqr_bounds(data: pd.DataFrame, threshold: float = 1.5) -> pd.DataFrame:
+    """
+    Outlier bounds by IQR method: Q1 - threshold * IQR and Q3 + threshold * IQR.
+    All quartiles are computed in one DataFrame.quantile call.
+    """
+    quartiles = data.quantile([0.25, 0.75])
+    q1 = quartiles.loc[0.25]
+    q3 = quartiles.loc[0.75]
+    iqr = q3 - q1
+    return pd.DataFrame({"lower": q1 - threshold * iqr, "upper": q3 + threshold * iqr})
+
+
+def zscore_bounds(data: pd.DataFrame, threshold: float = 3.0) -> pd.DataFrame:
+    """
+    Outlier bounds by z-score method: mean -/+ threshold * standard deviation.
+    """
+    mean = data.mean()
+    std = data.std()
+    return pd.DataFrame(
+        {"lower": mean - threshold * std, "upper": mean + threshold * std}
+    )
+
+
+def mad_bounds(data: pd.DataFrame, threshold: float = 3.5) -> pd.DataFrame:
+    """
+    Outlier bounds by median absolute deviation (MAD) method:
+    median -/+ threshold * 1.4826 * MAD (1.4826 makes MAD consistent with
+    standard deviation for normal distribution).
+    """
+    median = data.median()
+    mad = (data - median).abs().median() * 1.4826
+    return pd.DataFrame(
+        {"lower": median - threshold * mad, "upper": median + threshold * mad}
+    )
+
+
+OUTLIER_RULES = {"iqr": iqr_bounds, "zscore": zscore_bounds, "mad": mad_bounds}
+
+
+def outliers_all_columns(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    rule: Union[str, Callable[..., pd.DataFrame]] = "iqr",
+    threshold: Optional[float] = None,
+) -> Tuple[pd.Series, pd.DataFrame, pd.DataFrame]:
+    """
+    This function identifies outliers in many columns of DataFrame at once.
+    Bounds of all columns are computed in one call and outliers are found with
+    a boolean mask matrix in NumPy, instead of calling any_outliers_iqr and
+    joining results column by column.
+
+    Parameters:
+    df              pd.DataFrame    The DataFrame where we are looking for outliers
+    columns         list            columns in which we are looking for outliers,
+                                    default is all numeric columns
+    rule            str/callable    name of a rule in OUTLIER_RULES ('iqr', 'zscore',
+                                    'mad') or a function (data, threshold) returning
+                                    DataFrame with 'lower' and 'upper' bounds per column
+    threshold       float           multiplier of the rule, default is rule's default
+                                    (1.5 for 'iqr', 3.0 for 'zscore', 3.5 for 'mad')
+
+    Returns:
+    outlier_counts  pd.Series       number of outliers in every row of df
+    bounds          pd.DataFrame    'lower' and 'upper' bounds and number of
+                                    'outliers' per column
+    df_outliers     pd.DataFrame    rows with at least one outlier, values of
+                                    non-outlier cells are NaN, column 'outlier count'
+                                    holds number of outliers in the row
+    """
+    if columns is None:
+        columns = df.select_dtypes("number").columns.tolist()
+
+    bounds_func = OUTLIER_RULES[rule] if isinstance(rule, str) else rule
+    data = df[columns]
+    bounds = bounds_func(data) if threshold is None else bounds_func(data, threshold)
+    bounds = bounds.round(6)
+
+    values = data.to_numpy(dtype=float)
+    mask = (values < bounds["lower"].to_numpy()) | (values > bounds["upper"].to_numpy())
+
+    row_counts = mask.sum(axis=1)
+    bounds["outliers"] = mask.sum(axis=0)
+    outlier_counts = pd.Series(row_counts, index=df.index, name="outlier count")
+
+    rows = row_counts > 0
+    df_outliers = pd.DataFrame(
+        np.where(mask[rows], values[rows], np.nan),
+        index=df.index[rows],
+        columns=columns,
+    )
+    df_outliers["outlier count"] = row_counts[rows]
+
+    return outlier_counts, bounds, df_outliers
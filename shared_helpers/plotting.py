@@ -0,0 +1,367 @@
+"""
+Plotly figure helpers shared by the projects: figure layout, rendering with
+an export cache and deferred (parallel) export, and histogram / box plot EDA.
+
+Plotly is imported on first use, so importing the module is cheap in scripts
+that do not draw figures.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .display import show_figure, show_image
+
+if TYPE_CHECKING:
+    from plotly.graph_objs import Figure
+
+RENDER_CACHE_FILE = "images/.render_cache.json"
+
+_render_queue: List[Tuple[str, str, str]] = []
+
+# instrumentation hook, connected by shared_helpers.instrumentation when profiling
+_phase = nullcontext
+
+
+def _figure_hash(fig_json: str) -> str:
+    """
+    Content hash of a figure serialized to JSON.
+    """
+    return hashlib.sha256(fig_json.encode("utf-8")).hexdigest()
+
+
+def _load_render_cache() -> Dict[str, str]:
+    """
+    Loads mapping of image file -> figure hash of the last export.
+    """
+    if not os.path.exists(RENDER_CACHE_FILE):
+        return {}
+    with open(RENDER_CACHE_FILE, encoding="utf-8") as cache_file:
+        return json.load(cache_file)
+
+
+def _save_render_cache(cache: Dict[str, str]) -> None:
+    """
+    Saves mapping of image file -> figure hash of the last export.
+    """
+    os.makedirs(os.path.dirname(RENDER_CACHE_FILE), exist_ok=True)
+    with open(RENDER_CACHE_FILE, "w", encoding="utf-8") as cache_file:
+        json.dump(cache, cache_file, indent=1, sort_keys=True)
+
+
+def _export_figure_json(task: Tuple[str, str]) -> str:
+    """
+    Exports a figure given as (figure JSON, image file) with kaleido.
+    Used by the process pool, where every worker reuses its own kaleido process.
+    """
+    import plotly.io as pio
+
+    fig_json, image_file = task
+    pio.from_json(fig_json).write_image(image_file, engine="kaleido")
+    return image_file
+
+
+def fig_px_render(
+    fig_input: "Figure", method: str, fig_name: str = "figure", force: bool = False
+) -> None:
+    """
+    Render a Plotly figure based on the specified method.
+
+    Parameters:
+    - fig_input: Plotly Figure object to render.
+    - method: The method of rendering ('export', 'defer', 'github', or 'interactive').
+    - name: Optional name for the saved image file (default is "figure").
+    - force: Export even if the image file is up to date (default is False).
+
+    The function saves the figure as an image, displays the image,
+    or shows the interactive figure based on the specified method
+    (through the display backend, see shared_helpers.display).
+    Export is skipped if the image file exists and the figure has not changed
+    since the last export (figures are compared by hash of their JSON).
+    'defer' queues the figure for export with flush_render_queue.
+    """
+
+    image_file = f"images/{fig_name}.png"
+
+    if method in ("export", "defer"):
+        with _phase("serialize"):
+            fig_json = fig_input.to_json()
+            fig_hash = _figure_hash(fig_json)
+            cache = _load_render_cache()
+        if (
+            not force
+            and cache.get(image_file) == fig_hash
+            and os.path.exists(image_file)
+        ):
+            return
+        if method == "defer":
+            _render_queue.append((fig_json, image_file, fig_hash))
+            return
+        with _phase("export"):
+            fig_input.write_image(image_file, engine="kaleido")
+        cache[image_file] = fig_hash
+        _save_render_cache(cache)
+    elif method == "github":
+        show_image(image_file)
+    elif method == "interactive":
+        show_figure(fig_input)
+
+
+def flush_render_queue(n_jobs: int = 1) -> List[str]:
+    """
+    Exports all figures queued by fig_px_render(..., method="defer").
+
+    Parameters:
+    - n_jobs: Number of worker processes (default is 1, i.e. export in the
+      current process reusing one kaleido process). With n_jobs > 1 figures
+      are exported in parallel and total time is bounded by the slowest figures.
+
+    Returns:
+    - List of exported image files.
+    """
+    tasks = {}
+    hashes = {}
+    for fig_json, image_file, fig_hash in _render_queue:
+        tasks[image_file] = (fig_json, image_file)
+        hashes[image_file] = fig_hash
+    _render_queue.clear()
+
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            exported = list(executor.map(_export_figure_json, tasks.values()))
+    else:
+        exported = [_export_figure_json(task) for task in tasks.values()]
+
+    cache = _load_render_cache()
+    cache.update({image_file: hashes[image_file] for image_file in exported})
+    _save_render_cache(cache)
+
+    return exported
+
+
+def fig_update(
+    fig,
+    plot_title: str,
+    plot_subtitle: str,
+    x_title: str,
+    y_title: str,
+    legend_title: str = "Legend",
+    plot_width: int = 1000,
+    plot_height: int = 400,
+) -> "Figure":
+    """
+    The function conveniently updates most of plots drawn by
+    plotly.express with:
+
+    Parameters:
+    - fig: Plotly Figure object to update.
+    - plot_title: Title of the plot.
+    - plot_subtitle: Subtitle of the plot.
+    - x_title: Title of the x-axis.
+    - y_title: Title of the y-axis.
+    - legend_title: Title for the legend (default is "Legend").
+    - plot_width: width of the plot (default is 1000).
+    - plot_height: height of the plot (default is 400).
+
+    Returns:
+    - Updated Plotly Figure object.
+    """
+    fig.update_layout(
+        title_text=plot_title,
+        title_x=0.5,
+        title_font_size=20,
+        annotations=[
+            dict(
+                text=plot_subtitle,
+                xref="paper",
+                yref="paper",
+                x=0.5,
+                y=-0.27,
+                showarrow=False,
+                font=dict(size=16, color="black"),
+            )
+        ],
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        legend_title_text=legend_title,
+        autosize=False,
+        width=plot_width,
+        height=plot_height,
+    )
+    return fig
+
+
+def hist_box_traces_aggregated(
+    values: pd.Series, nbins: int, max_outliers: int = 1000, seed: int = 2024
+) -> Tuple[List[Any], List[Any]]:
+    """
+    Builds histogram and box plot traces from aggregates computed in NumPy,
+    so the size of the figure depends on number of bins, not on number of rows.
+
+    Parameters:
+    values        pd.Series   values of a feature
+    nbins         int         number of histogram bins
+    max_outliers  int         maximum number of outliers drawn in the box plot
+                              (a random sample if there are more), default is 1000
+    seed          int         seed of outlier sampling, default is 2024
+
+    Returns:
+    hist_traces   list with go.Bar trace of bin counts
+    box_traces    list with go.Box trace of precomputed quartiles and whiskers
+                  and go.Scatter trace of (sampled) outliers
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    data = values.dropna().to_numpy(dtype=float)
+    counts, edges = np.histogram(data, bins=nbins)
+    q1, median, q3 = np.percentile(data, [25, 50, 75])
+    iqr = q3 - q1
+    inside = data[(data >= q1 - 1.5 * iqr) & (data <= q3 + 1.5 * iqr)]
+    outliers = data[(data < q1 - 1.5 * iqr) | (data > q3 + 1.5 * iqr)]
+    if len(outliers) > max_outliers:
+        rng = np.random.default_rng(seed)
+        outliers = rng.choice(outliers, size=max_outliers, replace=False)
+
+    color = px.colors.qualitative.Plotly[0]
+    hist_traces = [
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            marker=dict(color=color),
+            name=values.name,
+            showlegend=False,
+        )
+    ]
+    box_traces = [
+        go.Box(
+            q1=[q1],
+            median=[median],
+            q3=[q3],
+            lowerfence=[inside.min()],
+            upperfence=[inside.max()],
+            y=[0],
+            orientation="h",
+            marker=dict(color=color),
+            name=values.name,
+            showlegend=False,
+        ),
+        go.Scatter(
+            x=outliers,
+            y=np.zeros(len(outliers)),
+            mode="markers",
+            marker=dict(color=color, size=4),
+            name="outliers",
+            showlegend=False,
+        ),
+    ]
+
+    return hist_traces, box_traces
+
+
+def hist_box_eda(
+    df: pd.DataFrame,
+    feature: str,
+    x_title: str,
+    sub_title: str,
+    render_mode: str,
+    title_mod: str = "",
+    stat_print: bool = True,
+    custom_low: float = 0.00,
+    custom_high: float = 0.00,
+    custom_flag: bool = False,
+    aggregate: bool = False,
+    nbins: int = 50,
+    transpose_summary: bool = False,
+) -> None:
+    """
+    The function renders a plotly histogram and prints statistical summary of a feature
+
+    Parameters:
+    df           pandas dataframe
+    feature      column in the dataframe
+    x_title      title of x axis
+    sub_title    plot subtitle (usually number of figure, e.g. Fig.11)
+    render_mode  an argument passed to another function, switch for rendering plotly charts
+                 interactively, export to .png or display static image
+    title_mod    modification of plot title in case it needs to be modified
+    stat_print   flag for statistical summary printing, default is 'True'
+    custom_low   custom lower bound for box plot line, default is 0.00
+    custom_high  custom upper bound for box plot line, default is 0.00
+    custom_flag  boolean flag for adding custom lines, default is 'False'
+    aggregate    flag for large data mode: histogram and box plot are built from bin
+                 counts and quartiles computed in NumPy instead of raw values,
+                 default is 'False'
+    nbins        number of histogram bins, default is 50
+    transpose_summary  print statistical summary as one row, default is 'False'
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    with _phase("construction"):
+        if aggregate:
+            hist_traces, box_traces = hist_box_traces_aggregated(df[feature], nbins)
+        else:
+            hist_traces = px.histogram(df, x=feature, nbins=nbins).data
+            box_traces = px.box(df, x=feature, orientation="h").data
+
+        fig = make_subplots(
+            rows=2,
+            cols=1,
+            shared_xaxes=True,
+            row_heights=[0.9, 0.1],
+            vertical_spacing=0.05,
+        )
+
+        for trace in hist_traces:
+            fig.add_trace(trace, row=1, col=1)
+
+        for trace in box_traces:
+            fig.add_trace(trace, row=2, col=1)
+
+        if aggregate:
+            fig.update_layout(bargap=0)
+            fig.update_yaxes(showticklabels=False, row=2, col=1)
+
+        if custom_flag:
+            fig.add_vline(x=custom_low, line=dict(color="red"), row=2, col=1)
+            fig.add_vline(x=custom_high, line=dict(color="red"), row=2, col=1)
+            fig.add_trace(
+                go.Scatter(
+                    x=[None],
+                    y=[custom_low],
+                    mode="lines",
+                    line=dict(color="red", dash="longdash"),
+                    name="typical levels",
+                    showlegend=True,
+                )
+            )
+
+        fig.update_xaxes(title_text=x_title, row=2, col=1, title_standoff=0)
+
+        fig_update(
+            fig,
+            f"Distribution of {feature.title() if feature != 'pH' else feature} {title_mod}",
+            f"<i>{sub_title}</i>",
+            "",
+            "Count",
+            "",
+            800,
+            400,
+        )
+
+    with _phase("render"):
+        fig_px_render(fig, render_mode, sub_title.replace(".", ""))
+
+    feature_description = pd.DataFrame(df[feature].describe()).round(3)
+    if transpose_summary:
+        feature_description = feature_description.T
+    print("\n", feature_description, "\n", sep="") if stat_print else None
@@ -0,0 +1,358 @@
+"""
+Statistical tests shared by the projects: batched t-tests with assumption
+checks and z-tests for proportions of a binary target, with Markdown
+summaries shown through the display backend (see shared_helpers.display).
+
+SciPy and statsmodels are imported on first use.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .display import show_markdown
+
+
+def ttest_batch(
+    df: pd.DataFrame,
+    features: List[str],
+    target: str,
+    alpha: float = 0.05,
+    correction: Optional[str] = None,
+) -> pd.DataFrame:
+    """The function conducts statistical tests for comparison of means of
+    many features' distributions for binary target's values at once:
+        - splits the data by target only once
+        - checks normality (Shapiro-Wilk) and variance homogeneity (Levene)
+          for all features with vectorized SciPy calls
+        - conducts Student's t-test where variances are homogenous and
+          Welch's t-test where they are not
+        - optionally corrects t-test p-values for multiple comparisons.
+
+    Parameters:
+    df           Pandas dataframe with data
+    features     list of numeric features for which the tests will be conducted
+    target       binary target feature (0/1) for distinction of distributions
+    alpha        significance level, default is 0.05
+    correction   method of statsmodels multipletests (e.g. "holm", "fdr_bh"),
+                 default is None (no correction)
+
+    Returns:
+    results      DataFrame with one row per feature and test statistics,
+                 p-values and conclusions in columns.
+    """
+    from scipy import stats
+
+    values = df[features].to_numpy(dtype=float)
+    distribution_0 = values[(df[target] == 0).to_numpy()]
+    distribution_1 = values[(df[target] == 1).to_numpy()]
+
+    shapiro_0 = stats.shapiro(distribution_0, axis=0)
+    shapiro_1 = stats.shapiro(distribution_1, axis=0)
+    levene = stats.levene(distribution_0, distribution_1, axis=0)
+    student = stats.ttest_ind(distribution_0, distribution_1, axis=0, equal_var=True)
+    welch = stats.ttest_ind(distribution_0, distribution_1, axis=0, equal_var=False)
+
+    equal_var = np.atleast_1d(levene.pvalue >= alpha)
+
+    results = pd.DataFrame(
+        {
+            "shapiro_0_stat": shapiro_0.statistic,
+            "shapiro_0_pvalue": shapiro_0.pvalue,
+            "shapiro_1_stat": shapiro_1.statistic,
+            "shapiro_1_pvalue": shapiro_1.pvalue,
+            "levene_stat": levene.statistic,
+            "levene_pvalue": levene.pvalue,
+            "equal_var": equal_var,
+            "ttest": np.where(equal_var, "Student", "Welch"),
+            "t_stat": np.where(equal_var, student.statistic, welch.statistic),
+            "t_pvalue": np.where(equal_var, student.pvalue, welch.pvalue),
+        },
+        index=pd.Index(features, name="feature"),
+    )
+
+    if correction is not None:
+        from statsmodels.stats.multitest import multipletests
+
+        _, pvalues_adj, _, _ = multipletests(
+            results["t_pvalue"], alpha=alpha, method=correction
+        )
+        results["t_pvalue_adj"] = pvalues_adj
+    else:
+        results["t_pvalue_adj"] = results["t_pvalue"]
+
+    results["normal_0"] = results["shapiro_0_pvalue"] >= alpha
+    results["normal_1"] = results["shapiro_1_pvalue"] >= alpha
+    results["significant"] = results["t_pvalue_adj"] < alpha
+
+    return results
+
+
+def ttest_results_markdown(results: pd.DataFrame, target: str) -> None:
+    """The function displays hypotheses, test results and conclusions
+    from ttest_batch output as Markdown, one block per feature.
+
+    Parameters:
+    results      DataFrame returned by ttest_batch
+    target       binary target feature used in ttest_batch
+
+    Returns:
+    None.
+    """
+    for feature, row in results.iterrows():
+        blocks = []
+
+        for i in (0, 1):
+            blocks.append(
+                f"""**Normality Test for "{feature}" where "{target}" = {i}:**  
+        H₀: The distribution of "{feature}" for "{target}" = {i} is normal.  
+        H₁: The distribution of "{feature}" for "{target}" = {i} is not normal."""
+            )
+            blocks.append(
+                f"Shapiro-Wilk test statistic: {row[f'shapiro_{i}_stat']:.4f}, "
+                f"p-value: {row[f'shapiro_{i}_pvalue']:.4e}"
+            )
+            blocks.append(
+                "**Conclusion:** Fail to reject H₀. The distribution is normal."
+                if row[f"normal_{i}"]
+                else "**Conclusion:** `Reject` H₀. The distribution is `not normal`."
+            )
+
+        blocks.append(
+            f"""<br>**Homogeneity of Variances Test for "{feature}":**  
+    H₀: The variances of "{feature}" for the two groups are equal.  
+    H₁: The variances of "{feature}" for the two groups are not equal."""
+        )
+        blocks.append(
+            f"Levene's test statistic: {row['levene_stat']:.4f}, "
+            f"p-value: {row['levene_pvalue']:.4e}"
+        )
+        blocks.append(
+            "**Conclusion:** Fail to reject H₀. The variances are equal."
+            if row["equal_var"]
+            else "**Conclusion:** `Reject` H₀. The variances are `not equal`."
+        )
+
+        blocks.append(
+            f"""<br>**T-Test for Means of "{feature}":**  
+    H₀: The means of "{feature}" for the two groups are equal.  
+    H₁: The means of "{feature}" for the two groups are not equal."""
+        )
+        p_value_text = f"p-value: {row['t_pvalue']:.4e}"
+        if row["t_pvalue_adj"] != row["t_pvalue"]:
+            p_value_text += f", adjusted p-value: {row['t_pvalue_adj']:.4e}"
+        blocks.append(f"T-test statistic: {row['t_stat']:.4f}, {p_value_text}")
+        blocks.append(
+            "**Conclusion:** `Reject` H₀. There is a `significant difference` in means."
+            if row["significant"]
+            else "**Conclusion:** Fail to reject H₀. No significant difference in means."
+        )
+
+        show_markdown("\n\n".join(blocks))
+
+
+def ttest_with_assumptions_check(df: pd.DataFrame, feature: str, target: str) -> None:
+    """The function formulates hypotheses and conducts statistical tests
+    for comparison of means of a feature's distributions for binary
+    target's values:
+        - checks distribution normality and variance homogeneity
+        - conducts Student's t-test if variances are homogenous
+        - conducts Welch's t-test if variances are not homogenous
+        - outputs results of all tests.
+
+    For many features at once use ttest_batch (and ttest_results_markdown).
+
+    Parameters:
+    df           Pandas datafrade with data
+    feature      feature for which the tests will be conducted
+    target       binary target feature for distinction of distributions
+
+    Returns:
+    None.
+    """
+    ttest_results_markdown(ttest_batch(df, [feature], target), target)
+
+
+def binary_contingency_table(
+    df: pd.DataFrame, features: List[str], target: str
+) -> pd.DataFrame:
+    """
+    Count/success table of a binary target for every value of every feature,
+    computed in a single pass with np.bincount over integer codes of all
+    features (no filtered DataFrame copies per feature or value).
+
+    Parameters:
+    df           Pandas dataframe with data
+    features     list of categorical (e.g. "Yes"/"No") features
+    target       binary target feature (0/1)
+
+    Returns:
+    table        DataFrame with columns "Feature", "Value", "count" and
+                 "successes" (number of target = 1), values sorted within feature.
+    """
+    y = df[target].to_numpy(dtype=float)
+    codes = []
+    target_values = []
+    feature_labels = []
+    value_labels = []
+    offset = 0
+
+    for feature in features:
+        col_codes, uniques = pd.factorize(df[feature], sort=True)
+        valid = col_codes >= 0
+        codes.append(col_codes[valid] + offset)
+        target_values.append(y[valid])
+        feature_labels.extend([feature] * len(uniques))
+        value_labels.extend(uniques)
+        offset += len(uniques)
+
+    flat_codes = np.concatenate(codes)
+    counts = np.bincount(flat_codes, minlength=offset)
+    successes = np.bincount(
+        flat_codes, weights=np.concatenate(target_values), minlength=offset
+    )
+
+    return pd.DataFrame(
+        {
+            "Feature": feature_labels,
+            "Value": value_labels,
+            "count": counts,
+            "successes": np.rint(successes).astype(np.int64),
+        }
+    )
+
+
+def binary_features_tests(
+    df: pd.DataFrame,
+    features: List[str],
+    target: str,
+    positive: str = "Yes",
+    negative: str = "No",
+    ci_method: str = "normal",
+    alpha: float = 0.05,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Derives proportions, conversion rate confidence intervals and z-tests for
+    proportions of target = 1 for all binary features from one contingency table.
+
+    Parameters:
+    df           Pandas dataframe with data
+    features     list of binary features ("Yes"/"No")
+    target       binary target feature (0/1)
+    positive     value of a feature for the first group, default is "Yes"
+    negative     value of a feature for the second group, default is "No"
+    ci_method    method of statsmodels proportion_confint ("normal", "wilson", ...),
+                 default is "normal"
+    alpha        significance level, default is 0.05
+
+    Returns:
+    summary_df   DataFrame with "Feature", "Value", "count", "Percentage", "mean",
+                 "Lower Bound", "Upper Bound" per feature value (data of Fig.7/Fig.8)
+    ztest_df     DataFrame with one row per feature, counts of both groups,
+                 z-test statistic, p-value and conclusion; positive and negative
+                 values are kept in ztest_df.attrs
+    """
+    from scipy import stats
+    from statsmodels.stats.proportion import proportion_confint
+
+    table = binary_contingency_table(df, features, target)
+
+    summary_df = table.copy()
+    feature_totals = summary_df.groupby("Feature")["count"].transform("sum")
+    summary_df["Percentage"] = 100 * summary_df["count"] / feature_totals
+    summary_df["mean"] = summary_df["successes"] / summary_df["count"]
+    lower_bound, upper_bound = proportion_confint(
+        summary_df["successes"], summary_df["count"], alpha=alpha, method=ci_method
+    )
+    summary_df["Lower Bound"] = lower_bound
+    summary_df["Upper Bound"] = upper_bound
+    summary_df = summary_df[
+        [
+            "Feature",
+            "Value",
+            "count",
+            "Percentage",
+            "mean",
+            "Lower Bound",
+            "Upper Bound",
+        ]
+    ]
+
+    indexed = table.set_index(["Feature", "Value"])
+    ztest_df = pd.DataFrame(
+        {
+            "count_yes": indexed["successes"].xs(positive, level="Value"),
+            "nobs_yes": indexed["count"].xs(positive, level="Value"),
+            "count_no": indexed["successes"].xs(negative, level="Value"),
+            "nobs_no": indexed["count"].xs(negative, level="Value"),
+        }
+    ).reindex(features)
+
+    p_yes = ztest_df["count_yes"] / ztest_df["nobs_yes"]
+    p_no = ztest_df["count_no"] / ztest_df["nobs_no"]
+    p_pooled = (ztest_df["count_yes"] + ztest_df["count_no"]) / (
+        ztest_df["nobs_yes"] + ztest_df["nobs_no"]
+    )
+    std_error = np.sqrt(
+        p_pooled * (1 - p_pooled) * (1 / ztest_df["nobs_yes"] + 1 / ztest_df["nobs_no"])
+    )
+    ztest_df["z_stat"] = (p_yes - p_no) / std_error
+    ztest_df["p_value"] = 2 * stats.norm.sf(np.abs(ztest_df["z_stat"]))
+    ztest_df["significant"] = ztest_df["p_value"] < alpha
+    ztest_df.index.name = "Feature"
+    ztest_df.attrs["positive"], ztest_df.attrs["negative"] = positive, negative
+
+    return summary_df, ztest_df
+
+
+def ztest_results_markdown(ztest_df: pd.DataFrame, target: str) -> None:
+    """
+    Displays hypotheses, z-test results and conclusions from
+    binary_features_tests output as Markdown, one block per feature.
+
+    Args:
+        ztest_df (DataFrame): z-test results returned by binary_features_tests.
+        target (str): The binary target variable used in the tests.
+
+    Returns:
+        None. Displays results using Markdown.
+    """
+    positive = ztest_df.attrs.get("positive", "Yes")
+    negative = ztest_df.attrs.get("negative", "No")
+    for feature, row in ztest_df.iterrows():
+        show_markdown(
+            f"""**Proportion Test for "{target}" = 1 proportions in "{feature}":**<br>
+            H₀: The proportion of 1 in "{target}" is equal for "{feature}" = "{positive}" and "{feature}" = "{negative}".<br>
+            H₁: The proportions are different."""
+        )
+
+        show_markdown(
+            f"Z-test statistic: {row['z_stat']:.4f}, p-value: {row['p_value']:.4e}"
+        )
+
+        if row["significant"]:
+            show_markdown(
+                f"**Conclusion:** `Reject` H₀. There is a `significant difference` in the proportions between the two groups.<br><br>"
+            )
+        else:
+            show_markdown(
+                f"**Conclusion:** Fail to reject H₀. There is no significant difference in the proportions between the two groups.<br><br>"
+            )
+
+
+def ztest_proportions_of_1(df: pd.DataFrame, feature: str, target: str) -> None:
+    """
+    Perform a Z-test for proportions of value 1 across two groups defined by a binary feature.
+    For many features at once use binary_features_tests (and ztest_results_markdown).
+
+    Args:
+        df (DataFrame): The dataset.
+        feature (str): The binary feature to test ("Yes"/"No").
+        target (str): The binary target variable for purchasing insurance (0/1).
+
+    Returns:
+        None. Displays results using Markdown.
+    """
+    _, ztest_df = binary_features_tests(df, [feature], target)
+    ztest_results_markdown(ztest_df, target)
@@ -0,0 +1,605 @@
+"""
+Model tuning helpers shared by the projects: cross validation of many models
+with one preprocessing per fold, pruning of invalid parameter combinations,
+hyperparameter search (grid, random, halving) and a persistent cache of
+cross validation scores of tuning candidates.
+
+scikit-learn and joblib are imported on first use.
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# instrumentation hooks, connected by shared_helpers.instrumentation when profiling
+_phase = nullcontext
+
+
+def _record_phase(name: str, seconds: float) -> None:
+    pass
+
+
+class TuningCache:
+    """
+    Persistent on-disk cache of cross validation scores of tuning candidates.
+
+    Every candidate is stored in its own JSON file named by a key, which is a
+    hash of the estimator (pipeline), the parameter set, the CV splitter,
+    the scoring and the training data. A candidate is written as soon as all
+    of its folds are scored, so an interrupted search resumes from the last
+    completed candidate. Total size of the cache is bounded: least recently
+    used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir: str = ".tuning_cache", max_size_mb: float = 50.0):
+        """
+        Params:
+        cache_dir         Directory for cache files (default ".tuning_cache")
+        max_size_mb       Size limit of the cache in MB (default 50)
+        """
+        self.cache_dir = cache_dir
+        self.max_size_mb = max_size_mb
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def key(
+        self,
+        estimator_hash: str,
+        params: Dict[str, Any],
+        cv_hash: str,
+        data_hash: str,
+        scoring: str,
+    ) -> str:
+        """
+        Cache key of a candidate from pre-computed hashes of the estimator,
+        CV splitter and data, and the candidate's parameter set.
+        """
+        from joblib import hash as joblib_hash
+
+        params_hash = joblib_hash(sorted(params.items()))
+        parts = "|".join([estimator_hash, params_hash, cv_hash, data_hash, scoring])
+        return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """
+        Returns fold scores of a cached candidate or None. Reading an entry
+        marks it as recently used.
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(path)
+        return entry["scores"]
+
+    def put(
+        self, key: str, scores: List[float], params: Dict[str, Any], model: str
+    ) -> None:
+        """
+        Stores fold scores of a candidate (written atomically).
+        """
+        entry = {
+            "model": model,
+            "params": {name: repr(value) for name, value in params.items()},
+            "scores": [float(score) for score in scores],
+            "created": time.time(),
+        }
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as entry_file:
+            json.dump(entry, entry_file)
+        os.replace(tmp_path, self._path(key))
+
+    def _entries(self) -> List[Tuple[str, os.stat_result]]:
+        return [
+            (entry.path, entry.stat())
+            for entry in os.scandir(self.cache_dir)
+            if entry.name.endswith(".json")
+        ]
+
+    def evict(self) -> int:
+        """
+        Removes least recently used entries until the cache fits max_size_mb.
+
+        Returns:
+        Number of removed entries.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total_size = sum(stat.st_size for _, stat in entries)
+        limit = self.max_size_mb * 1024**2
+        removed = 0
+
+        for path, stat in entries:
+            if total_size <= limit:
+                break
+            os.remove(path)
+            total_size -= stat.st_size
+            removed += 1
+
+        return removed
+
+    def invalidate(self, model: Optional[str] = None) -> int:
+        """
+        Removes all entries or entries of one model only.
+
+        Params:
+        model             Reference name of a model (default None - all entries)
+
+        Returns:
+        Number of removed entries.
+        """
+        removed = 0
+        for path, _ in self._entries():
+            if model is not None:
+                with open(path, encoding="utf-8") as entry_file:
+                    if json.load(entry_file).get("model") != model:
+                        continue
+            os.remove(path)
+            removed += 1
+
+        return removed
+
+
+def _candidate_scores(
+    index: int,
+    estimator_pipe: Any,
+    params: Dict[str, Any],
+    cv: Any,
+    X_vars: pd.DataFrame,
+    y_array: np.ndarray,
+    scoring: str,
+) -> Tuple[int, np.ndarray]:
+    """
+    Cross validation scores of one candidate (NaN for folds failed to fit)
+    together with the candidate's index.
+    """
+    from sklearn.base import clone
+    from sklearn.model_selection import cross_val_score
+
+    estimator = clone(estimator_pipe).set_params(**params)
+    scores = cross_val_score(
+        estimator, X_vars, y_array, cv=cv, scoring=scoring, error_score=np.nan
+    )
+    return index, scores
+
+
+def cached_search(
+    estimator_pipe: Any,
+    candidates: List[Dict[str, Any]],
+    cv: Any,
+    X_vars: pd.DataFrame,
+    y_array: np.ndarray,
+    cache: TuningCache,
+    model: str,
+    scoring: str = "average_precision",
+    n_jobs: int = -1,
+) -> Tuple[Dict[str, Any], float, float, int]:
+    """
+    Evaluates candidates with cross validation, loading completed candidates
+    from the cache and storing newly evaluated ones as soon as they finish.
+
+    Params:
+    estimator_pipe    Estimator (model or pipeline) for tuning
+    candidates        List of parameter sets
+    cv                Cross validation folds or splitter (should be deterministic,
+                      e.g. StratifiedKFold with random_state)
+    X_vars            Independent variables subset
+    y_array           Target variable array
+    cache             TuningCache instance
+    model             Reference name of a model
+    scoring           Scoring of cross validation (default "average_precision")
+    n_jobs            Number of parallel jobs (default -1 - all cores)
+
+    Returns:
+    best_params       Parameters of the best candidate
+    best_score        Mean CV score of the best candidate
+    best_std          Standard deviation of CV scores of the best candidate
+    n_loaded          Number of candidates loaded from the cache
+    """
+    from joblib import Parallel, delayed
+    from joblib import hash as joblib_hash
+    from sklearn.base import clone
+
+    estimator_hash = joblib_hash(clone(estimator_pipe))
+    cv_hash = joblib_hash(cv)
+    data_hash = joblib_hash((X_vars, y_array))
+
+    keys = [
+        cache.key(estimator_hash, params, cv_hash, data_hash, scoring)
+        for params in candidates
+    ]
+    scores = [cache.get(key) for key in keys]
+    missing = [
+        i for i, candidate_scores in enumerate(scores) if candidate_scores is None
+    ]
+    n_loaded = len(candidates) - len(missing)
+
+    print(
+        f"Candidates loaded from cache: {n_loaded}, "
+        f"candidates to evaluate: {len(missing)}"
+    )
+
+    if missing:
+        results = Parallel(n_jobs=n_jobs, return_as="generator_unordered")(
+            delayed(_candidate_scores)(
+                i, estimator_pipe, candidates[i], cv, X_vars, y_array, scoring
+            )
+            for i in missing
+        )
+        for i, candidate_scores in results:
+            scores[i] = candidate_scores.tolist()
+            cache.put(keys[i], scores[i], candidates[i], model)
+
+    cache.evict()
+
+    scores_array = np.array(scores, dtype=float)
+    means = scores_array.mean(axis=1)
+    means = np.where(np.isnan(means), -np.inf, means)
+    best_index = int(np.argmax(means))
+
+    return (
+        candidates[best_index],
+        float(scores_array[best_index].mean()),
+        float(scores_array[best_index].std()),
+        n_loaded,
+    )
+
+
+def _fit_score_fold(
+    model_name: str,
+    fold: int,
+    model: Any,
+    fold_data: Tuple[Any, np.ndarray, Any, np.ndarray],
+    scorers: Dict[str, Any],
+) -> Tuple[str, int, Dict[str, float], Tuple[float, float]]:
+    """
+    Fits a model on a transformed training fold and scores it on the
+    transformed test fold with every scorer. Also returns fit and score times.
+    """
+    from sklearn.base import clone
+
+    X_fold_train, y_fold_train, X_fold_test, y_fold_test = fold_data
+    start_time = time.perf_counter()
+    fitted = clone(model).fit(X_fold_train, y_fold_train)
+    fit_time = time.perf_counter() - start_time
+    scores = {
+        metric: scorer(fitted, X_fold_test, y_fold_test)
+        for metric, scorer in scorers.items()
+    }
+    score_time = time.perf_counter() - start_time - fit_time
+    return model_name, fold, scores, (fit_time, score_time)
+
+
+def cross_validate_models(
+    models: List[Tuple[str, Any]],
+    preprocessor: Any,
+    X_vars: pd.DataFrame,
+    y_array: np.ndarray,
+    cv: Any,
+    models_df: pd.DataFrame,
+    scoring: Optional[Dict[str, str]] = None,
+    n_jobs: int = -1,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    The function cross validates many models on all requested metrics at once.
+    The preprocessor is fitted and the data transformed only once per fold,
+    every model is fitted once per fold and scored with all metrics, and
+    model/fold fits run in parallel.
+    Scores are the same as of cross_val_score with a Pipeline of the
+    preprocessor and the model, called once per metric.
+
+    Params:
+    models            List of (model name, estimator) tuples
+    preprocessor      Preprocessing transformer (e.g. ColumnTransformer)
+    X_vars            Independent variables subset
+    y_array           Target variable array
+    cv                Cross validation folds or splitter
+    models_df         DataFrame with column "Model" for CV means and stds
+    scoring           Dict of metric name -> sklearn scoring name (default
+                      {"Accuracy": "accuracy", "PR AUC": "average_precision"})
+    n_jobs            Number of parallel jobs (default -1 - all cores)
+
+    Returns:
+    models_df         DataFrame appended with "<metric> Mean (CV)" and
+                      "<metric> STD (CV)" columns
+    cv_data_df        DataFrame with column "Model" and an array of fold
+                      scores per metric (data of Fig.11)
+    """
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+    from sklearn.metrics import get_scorer
+    from sklearn.model_selection import check_cv
+
+    if scoring is None:
+        scoring = {"Accuracy": "accuracy", "PR AUC": "average_precision"}
+    scorers = {metric: get_scorer(name) for metric, name in scoring.items()}
+
+    y_array = np.asarray(y_array).ravel()
+    splitter = check_cv(cv, y_array, classifier=True)
+
+    folds = []
+    with _phase("preprocess"):
+        for train_idx, test_idx in splitter.split(X_vars, y_array):
+            fold_preprocessor = clone(preprocessor)
+            X_fold_train = fold_preprocessor.fit_transform(X_vars.iloc[train_idx])
+            X_fold_test = fold_preprocessor.transform(X_vars.iloc[test_idx])
+            folds.append(
+                (X_fold_train, y_array[train_idx], X_fold_test, y_array[test_idx])
+            )
+
+    with _phase("fit and score"):
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_score_fold)(model_name, fold, model, fold_data, scorers)
+            for model_name, model in models
+            for fold, fold_data in enumerate(folds)
+        )
+
+    fold_scores = {
+        (model_name, fold): scores for model_name, fold, scores, _ in results
+    }
+    _record_phase("fit (all folds)", sum(times[0] for *_, times in results))
+    _record_phase("score (all folds)", sum(times[1] for *_, times in results))
+
+    cv_data = []
+    for model_name, _ in models:
+        model_scores = {
+            metric: np.array(
+                [fold_scores[(model_name, fold)][metric] for fold in range(len(folds))]
+            )
+            for metric in scoring
+        }
+
+        for metric, scores in model_scores.items():
+            models_df.loc[
+                models_df["Model"] == model_name,
+                [f"{metric} Mean (CV)", f"{metric} STD (CV)"],
+            ] = [scores.mean(), scores.std()]
+
+        cv_data.append({"Model": model_name, **model_scores})
+
+    cv_data_df = pd.DataFrame(cv_data)
+
+    return models_df, cv_data_df
+
+
+LOGISTIC_PENALTIES = {"l1", "l2", "elasticnet", None}
+
+LOGISTIC_SOLVER_PENALTIES = {
+    "liblinear": {"l1", "l2"},
+    "lbfgs": {"l2", None},
+    "newton-cg": {"l2", None},
+    "newton-cholesky": {"l2", None},
+    "sag": {"l2", None},
+    "saga": {"l1", "l2", "elasticnet", None},
+}
+
+
+def _is_valid_candidate(estimator_pipe: Any, params: Dict[str, Any]) -> bool:
+    """
+    Checks whether a parameter combination can be fitted: every step of the
+    estimator (pipeline) must accept its parameter values and combinations
+    known to fail in fit (e.g. penalty="l1" with solver="lbfgs") are rejected.
+    """
+    from sklearn.base import clone
+    from sklearn.linear_model import LogisticRegression
+
+    estimator = clone(estimator_pipe).set_params(**params)
+    steps = estimator.steps if hasattr(estimator, "steps") else [(None, estimator)]
+
+    for _, step in steps:
+        if hasattr(step, "_validate_params"):
+            try:
+                step._validate_params()
+            except (ValueError, TypeError):
+                return False
+        if isinstance(step, LogisticRegression) and step.penalty in LOGISTIC_PENALTIES:
+            supported = LOGISTIC_SOLVER_PENALTIES.get(step.solver)
+            if supported is not None and step.penalty not in supported:
+                return False
+
+    return True
+
+
+def prune_param_grid(
+    estimator_pipe: Any, param_grid: Dict[str, Any]
+) -> Tuple[List[Dict[str, List[Any]]], int]:
+    """
+    Expands a parameter grid and removes invalid parameter combinations
+    before fitting.
+
+    Params:
+    estimator_pipe    Estimator (model or pipeline) for tuning
+    param_grid        Grid of hyper parameters (dict or list of dicts)
+
+    Returns:
+    pruned_grid       List of single-candidate grids accepted by search classes
+    n_pruned          Number of removed combinations
+    """
+    from sklearn.model_selection import ParameterGrid
+
+    candidates = list(ParameterGrid(param_grid))
+    valid = [
+        params for params in candidates if _is_valid_candidate(estimator_pipe, params)
+    ]
+    pruned_grid = [
+        {name: [value] for name, value in params.items()} for params in valid
+    ]
+
+    return pruned_grid, len(candidates) - len(valid)
+
+
+def best_tuned_model(
+    estimator_pipe: Any,
+    param_grid: Dict[str, Any],
+    cv: int,
+    X_vars: pd.DataFrame,
+    y_array: pd.Series,
+    models_df: pd.DataFrame,
+    model: str,
+    tuned_models_dict: Dict[str, Any],
+    search: str = "grid",
+    n_iter: int = 60,
+    prune: bool = True,
+    random_state: Optional[int] = None,
+    cache: Optional[TuningCache] = None,
+) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    """
+    The function searches for best hyperparameters for a model and prints them out.
+    Calculates best score for the minority class (PR AUC) and standard eviation of the score.
+    Adds score and standar deviation to a dataframe for future reference.
+    Adds the tuned best model to a dict for future use.
+    Prints search time and numbers of fitted candidates and of candidates
+    loaded from the cache.
+
+    Params:
+    estimator_pipe    Estimator (model or pipeline) for tuning
+    param_grid        Grid of hyper parameters to be tuned
+    cv                Cross validation folds
+    X_vars            Independent variables subset
+    y_array           Target variable array
+    models_df         DataFrame with list of models, their scores and std
+    model             Reference name of a model
+    tuned_models_dict Dict with tuned models
+    search            Search strategy: "grid" (exhaustive GridSearchCV, default),
+                      "random" (RandomizedSearchCV with n_iter candidates),
+                      "halving_grid" (HalvingGridSearchCV) or
+                      "halving_random" (HalvingRandomSearchCV); halving searches
+                      use all training rows in the last iteration
+    n_iter            Number of sampled candidates for "random" search and of
+                      first-iteration candidates for "halving_random" (default 60)
+    prune             Remove invalid parameter combinations before fitting
+                      (default True)
+    random_state      Seed for randomized and halving searches (default None)
+    cache             TuningCache for persistent per-candidate fold scores; completed
+                      candidates are loaded instead of refit and an interrupted
+                      search resumes (only "grid" and "random", default None)
+
+    Returns:
+    tuned_models_dict Dict with tuned models appended with current model tuned
+    models_df         DataFrame with models, their scores and std, appended with
+                      relevant information
+
+    """
+    from sklearn.base import clone
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import (
+        GridSearchCV,
+        HalvingGridSearchCV,
+        HalvingRandomSearchCV,
+        ParameterGrid,
+        ParameterSampler,
+        RandomizedSearchCV,
+    )
+
+    if prune:
+        param_grid, n_pruned = prune_param_grid(estimator_pipe, param_grid)
+        print("Invalid candidates pruned:", n_pruned)
+
+    start_time = time.perf_counter()
+
+    if cache is not None:
+        if search == "grid":
+            candidates = list(ParameterGrid(param_grid))
+        elif search == "random":
+            candidates = list(
+                ParameterSampler(param_grid, n_iter, random_state=random_state)
+            )
+        else:
+            raise ValueError("Cache supports only 'grid' and 'random' searches.")
+
+        with _phase("search"):
+            best_params, best_score, best_std, n_loaded = cached_search(
+                estimator_pipe, candidates, cv, X_vars, y_array, cache, model
+            )
+        with _phase("refit"):
+            best_estimator = clone(estimator_pipe).set_params(**best_params)
+            best_estimator.fit(X_vars, y_array)
+        n_fitted = len(candidates) - n_loaded
+    else:
+        search_params = dict(
+            estimator=estimator_pipe,
+            cv=cv,
+            n_jobs=-1,
+            verbose=1,
+            scoring="average_precision",
+        )
+
+        if search == "grid":
+            grid_search = GridSearchCV(param_grid=param_grid, **search_params)
+        elif search == "random":
+            grid_search = RandomizedSearchCV(
+                param_distributions=param_grid,
+                n_iter=n_iter,
+                random_state=random_state,
+                **search_params,
+            )
+        elif search == "halving_grid":
+            grid_search = HalvingGridSearchCV(
+                param_grid=param_grid,
+                min_resources="exhaust",
+                random_state=random_state,
+                **search_params,
+            )
+        elif search == "halving_random":
+            grid_search = HalvingRandomSearchCV(
+                param_distributions=param_grid,
+                n_candidates=n_iter,
+                min_resources="exhaust",
+                random_state=random_state,
+                **search_params,
+            )
+        else:
+            raise ValueError(
+                f"Unknown search '{search}', use 'grid', 'random', 'halving_grid' "
+                "or 'halving_random'."
+            )
+
+        with _phase("search"):
+            grid_search.fit(X_vars, y_array)
+        # fit and score times of all candidates and folds (summed over workers)
+        cv_results = grid_search.cv_results_
+        _record_phase(
+            "fit (all folds)",
+            cv_results["mean_fit_time"].sum() * grid_search.n_splits_,
+        )
+        _record_phase(
+            "score (all folds)",
+            cv_results["mean_score_time"].sum() * grid_search.n_splits_,
+        )
+        _record_phase("refit", grid_search.refit_time_)
+
+        best_params = grid_search.best_params_
+        best_score = grid_search.best_score_
+        best_std = grid_search.cv_results_["std_test_score"][grid_search.best_index_]
+        best_estimator = grid_search.best_estimator_
+        # halving searches list a candidate again in every iteration it survives
+        n_fitted = len(
+            {repr(sorted(params.items())) for params in cv_results["params"]}
+        )
+        n_loaded = 0
+
+    search_time = time.perf_counter() - start_time
+
+    print("Best hyperparameters:", best_params)
+    print("Best score:", np.round(best_score, 6))
+    print("Best score STD:", np.round(best_std, 6))
+    print("Candidates fitted:", n_fitted)
+    print("Candidates loaded from cache:", n_loaded)
+    print(f"Search time: {search_time:.1f} s")
+
+    models_df.loc[
+        models_df["Model"] == model, ["Tuned Best Mean", "Tuned Best STD"]
+    ] = [np.round(best_score, 6), np.round(best_std, 6)]
+
+    tuned_models_dict[model] = best_estimator
+
+    return tuned_models_dict, models_df